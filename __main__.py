@@ -1,25 +1,85 @@
 from save_manager import SaveManager
 from os import environ
-import random
-random_seed = environ.get("TEXTADV_RNG_SEED", "seed0001")
-random.seed(random_seed)
-
 import argparse
+import random
+import sys
 
-import world
+import input_providers
+import profiling
+import recording
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--web", action="store_true")
     parser.add_argument("--save")
+    parser.add_argument(
+        "--prefetch-radius", type=float,
+        help="build caves once the hero is this close to them",
+    )
+    parser.add_argument("--commands", help="read commands from this file")
+    parser.add_argument("--record", help="write a trace of the game here")
+    parser.add_argument("--replay", help="replay a trace and check it matches")
+    parser.add_argument(
+        "--profile", action="store_true",
+        default=bool(environ.get("TEXTADV_PROFILE")),
+        help="report where run_game spends its time (or set TEXTADV_PROFILE)",
+    )
     args = parser.parse_args()
 
+    # Options that shape the world, and so are kept in recorded traces
+    world_options = {
+        "prefetch_radius": args.prefetch_radius,
+    }
+    if args.replay:
+        trace = recording.Trace.load(args.replay)
+        random_seed = trace.seed
+        # Older traces may name options since dropped, that never changed
+        # the world (region_workers)
+        world_options.update(
+            (name, value) for name, value in trace.options.items()
+            if name in world_options
+        )
+    else:
+        random_seed = environ.get("TEXTADV_RNG_SEED", "seed0001")
+    # Seeded before importing world, as some modules use random on import
+    random.seed(random_seed)
+
+    import world
+
     save_manager = SaveManager()
     if args.save:
         w = save_manager.load(args.save)
     else:
         w = world.Random(
             use_web_output=args.web,
-            save_manager=SaveManager()
+            save_manager=SaveManager(),
+            **world_options
         )
-    w.run_game()
+
+    if args.commands:
+        w.actor.ai.input_source = input_providers.FileInput(args.commands)
+
+    if args.profile:
+        profiler = profiling.Profiler()
+        profiler.attach(w.schedule)
+
+    try:
+        if args.replay:
+            mismatch = trace.first_mismatch(trace.replay(w))
+            if mismatch is None:
+                print("Replay matches the trace.")
+            else:
+                print("Replay diverges from the trace at entry {}.".format(mismatch))
+                sys.exit(1)
+        elif args.record:
+            with open(args.record, "w") as trace_file:
+                recorder = recording.TraceRecorder(
+                    trace_file, random_seed, world_options
+                )
+                recorder.attach(w)
+                w.run_game()
+        else:
+            w.run_game()
+    finally:
+        if args.profile:
+            print(profiler.report(), file=sys.stderr)
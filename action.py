@@ -23,10 +23,27 @@ def match_action_to_string(actor, input_string):
     return Verb.match_action_to_string(actor, input_string)
 
 
+# Categories of action that listeners can take an interest in, and the
+# class flags that put an action in each.
+category_flags = {
+    "movement": ("traverses_portals", "travels_overland"),
+    "hostile": ("is_hostile",),
+    "locking": ("locks_things",),
+    "social": ("is_social",),
+    "transaction": ("is_transaction",),
+    "speech": ("is_speech",),
+    "handling": ("handles_items",),
+}
+
+
 class ActionMeta(type):
     def __init__(cls: "Action", name, bases, dct):
         if cls.VerbClass and cls.synonyms and not cls.hidden:
             cls.verb = cls.VerbClass(cls)
+        cls.categories = frozenset(
+            category for category, flags in category_flags.items()
+            if any(getattr(cls, flag) for flag in flags)
+        )
 
 # ABSTRACT ACTIONS
 
@@ -41,9 +58,16 @@ class Action(metaclass=ActionMeta):
     time_elapsed = 1000  # In milliseconds of imaginary game time.
     cooldown_time = 500
     is_hostile = False
+    is_physical_attack = False
     is_instant = False
     traverses_portals = False
+    travels_overland = False
+    locks_things = False
     is_social = False
+    is_transaction = False
+    is_speech = False
+    handles_items = False
+    categories = frozenset()
     synonyms = []
     number_of_targets = 0  # 0, 1, or 2, or more if I go crazy.
     target_traits = []
@@ -72,10 +96,7 @@ class Action(metaclass=ActionMeta):
         return False
 
     def moves_actor(self):
-        return (
-            getattr(self, "traverses_portals", False)
-            or getattr(self, "travels_overland", False)
-        )
+        return "movement" in self.categories
 
     def check_target_number(self):
         # debug(self.target_list)
@@ -428,6 +449,7 @@ class Speak(ZeroTargetAction):
     time_elapsed = 100
     cooldown_time = 100
     hidden = True
+    is_speech = True
     synonyms = ["speak"]
 
     def __init__(self, actor, *target_list, text="TEXT"):
@@ -473,6 +495,7 @@ class RemoveArmor(ZeroTargetAction):
 
 class Take(mixins.ItemTarget, SingleTargetAction):
     synonyms = ["take", "get", "pick up", "grab", ]
+    handles_items = True
 
     def check_geometry(self):
         if self.actor.has_thing(self.target):
@@ -489,6 +512,7 @@ class Take(mixins.ItemTarget, SingleTargetAction):
 
 class Drop(mixins.HeldTarget, SingleTargetAction):
     synonyms = ["drop"]
+    handles_items = True
 
     def affect_game(self):
         self.target.change_location(
@@ -681,6 +705,7 @@ class VectorTravel(ZeroTargetAction):
 
 class Transaction(ToolAction):
     is_social = True
+    is_transaction = True
 
     def get_names(self, viewer=None):
         if viewer is None:
@@ -750,6 +775,7 @@ class Sell(Transaction):
 
 class RentInnRoom(SingleTargetAction):
     is_social = True
+    is_transaction = True
     synonyms = ["rent", "rent room"]
     time_elapsed = 28800000
 
@@ -800,6 +826,8 @@ class Routine:
     time_elapsed = 0
     cooldown_time = 0
     empty_reason = "That doesn't make sense."
+    # Categories of action whose announcements this routine reacts to
+    interests = frozenset({"movement"})
 
     def __init__(self, actor, *target_list):
         # TODO: This "mixin" calling a constructor is invalid
@@ -815,13 +843,24 @@ class Routine:
     def agrees_to(self, own_action):
         return True
 
+    def wants_announcement(self, action):
+        """Whether this routine, or the one it is running, reacts to action.
+
+        Announcements of actions that aren't aimed at the actor are only
+        delivered when this is true.
+        """
+        if self.interests.isdisjoint(action.categories):
+            routine = self.routine
+            return (
+                routine is not None and not routine.complete
+                and routine.wants_announcement(action)
+            )
+        return True
+
     def hear_announcement(self, action):
         if self.routine and not self.routine.complete:
             self.routine.hear_announcement(action)
-        if (
-                getattr(action, "traverses_portals", False)
-                and self.actor.awake
-        ):
+        if action.traverses_portals and self.actor.awake:
             # question of the day: Why does this not happen?
             # print_("Saw thing due to entrance announcement")
             self.see_thing(action.actor)
@@ -840,9 +879,19 @@ class Routine:
         else:
             return False, "That person is unconscious."
 
+    def view_changed(self, entered, left):
+        """Called when the actor moves, with what came into and left view."""
+        for thing in entered:
+            self.see_thing(thing)
+        for thing in left:
+            self.lose_sight_of(thing)
+
     def see_thing(self, thing):
         pass
 
+    def lose_sight_of(self, thing):
+        pass
+
     def is_none(self):
         return self.complete
 
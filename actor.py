@@ -27,6 +27,10 @@ class Actor(game_object.Thing):
         self.traits.add(trait.listener())
         self.scheduled_event = None
         self.ai : Optional[ai.AI] = None
+        # What was in view after the actor last moved, and the generation
+        # of its location then
+        self.in_view = set()
+        self.view_generation = 0
         self.actor_strategy_dict = dict()
         # self.action_queue = list()
         self.timer = 0
@@ -55,12 +59,29 @@ class Actor(game_object.Thing):
     def change_location(
         self, new_location, coordinates=None, keep_arranged=False
     ):
-        # This is pretty slow! Probably don't do this
         assert self.schedule is not None
+        same_location = new_location is self.location
         super().change_location(new_location, coordinates, keep_arranged)
-        for item in new_location.things:
-            if new_location.line_of_sight(self, item):
-                self.ai.see_thing(item)
+        in_view = new_location.things_in_view(self)
+        # An actor never sights itself
+        in_view.discard(self)
+        if same_location:
+            # Only a step across a wide location: the view barely changes.
+            # Things that moved since the last step count as sighted anew,
+            # even if they were in view both times.
+            entered = {
+                thing for thing in in_view
+                if (
+                    thing not in self.in_view
+                    or thing.arrival_generation > self.view_generation
+                )
+            }
+        else:
+            entered = in_view
+        left = self.in_view - in_view
+        self.in_view = in_view
+        self.view_generation = new_location.generation
+        self.ai.view_changed(entered, left)
 
     def change_coordinates(self, new_coordinates, keep_arranged=False):
         self.change_location(self.location, new_coordinates, keep_arranged)
@@ -72,6 +93,7 @@ class Actor(game_object.Thing):
     def vanish(self):
         self.schedule.remove_actor(self)
         super().vanish()
+        self.in_view = set()
 
     def materialize(self, location, coordinates=None):
         self.schedule = location.schedule
@@ -81,6 +103,11 @@ class Actor(game_object.Thing):
     def cancel_actions(self):
         self.schedule.cancel_actions(self)
 
+    def action_targets_self(self, action):
+        # Being acted upon wakes an actor that was waiting indefinitely
+        if self.schedule is not None:
+            self.schedule.wake(self)
+
     def set_routine(self, routine):
         self.ai.set_routine(routine)
 
@@ -88,7 +115,7 @@ class Actor(game_object.Thing):
         pass
 
     def announce(self, action):
-        if getattr(action, "traverses_portals", False):
+        if action.traverses_portals:
             for loc in (action.target.location,
                         action.target.opposite().location):
                 if loc:
@@ -130,6 +157,9 @@ class Person(Actor):
         self.get_health_report = self.body.get_health_report
         self.money = 0
 
+    def wants_announcement(self, action):
+        return self.ai.wants_announcement(action)
+
     def hear_announcement(self, action):
         self.ai.hear_announcement(action)
 
@@ -302,7 +332,7 @@ class Person(Actor):
                 return False, "You cannot speak to an unconscious person."
 
         elif (
-            self.awake and getattr(action, "is_physical_attack", False)
+            self.awake and action.is_physical_attack
         ):
             name = action.actor.get_identifier(self)
             parry_roll = self.get_parry_roll()
@@ -351,7 +381,13 @@ class Person(Actor):
         return [x for x in self.get_valid_targets() if x.has_trait(trait)]
 
     def get_valid_targets(self):
-        return self.things | self.location.get_interactables(self)
+        # Kept by the location, which hears of changes to this inventory too
+        return self.location.cached_view(
+            ("targets", self),
+            lambda: frozenset(
+                self.things | self.location.get_interactables(self)
+            ),
+        )
 
     def spend_time(self, time_spent):
         pass
@@ -32,7 +32,7 @@ def agent_print(*args, **kwargs):
 
 def set_choice(in_set):
     try:
-        return choice(tuple(in_set))
+        return choice(sorted(in_set, key=lambda t: t.coordinates))
     except IndexError:
         return None
 
@@ -353,20 +353,26 @@ class ShopkeeperAgent(PopulationAgent):
             town=None,
         )
 
-    def town_utility(self, town):
+    def town_utility(self, town, distance=None):
         if town.destroyed:
             return -float("inf")
         crowding = len(town.site.populations)+1
-        distance = self.location.distance(self, town)
+        if distance is None:
+            distance = self.location.distance(self, town)
         return -(town.unrest + distance + crowding)
 
     def find_town(self):
-        town_agents = self.location.things_with_trait(
+        town_agents = list(self.location.things_with_trait(
             trait.town, self.coordinates, 30
-        )
+        ))
         if not town_agents:
             return None
-        return max(town_agents, key=self.town_utility)
+        distances = self.location.distances(self, town_agents)
+        utilities = [
+            self.town_utility(town, distance)
+            for town, distance in zip(town_agents, distances)
+        ]
+        return town_agents[utilities.index(max(utilities))]
 
     def move_towns(self, new_town):
         
@@ -460,6 +466,9 @@ class ExternalNuisance(PopulationAgent):
     def site_preference(self, site):
         return 0
 
+    def site_preferences(self, sites):
+        return [self.site_preference(site) for site in sites]
+
     def get_morph(self):
         return self.morph_type()
 
@@ -501,17 +510,20 @@ class ExternalNuisance(PopulationAgent):
             center=self.coordinates,
             radius=10,
         )
-        candidate_sites = [
-            site for site in nearby_sites if site.allows_population(self)
-        ]
+        candidate_sites = sorted(
+            (site for site in nearby_sites if site.allows_population(self)),
+            key=lambda site: site.landmark.coordinates,
+        )
         if not candidate_sites:
             agent_print(f"Finding no suitable home, {self.name} disbanded")
             self.vanish()
             return False
         else:
             shuffle(candidate_sites)
-            site = max(candidate_sites, key=self.site_preference)
-            if self.site_preference(site) < self.own_site_preference():
+            preferences = self.site_preferences(candidate_sites)
+            best = max(preferences)
+            site = candidate_sites[preferences.index(best)]
+            if best < self.own_site_preference():
                 site = self.create_own_site()
             self.change_site(site)
             if site is not None and self.wants_to_morph(site):
@@ -653,6 +665,12 @@ class GiantAntSwarm(ExternalNuisance):
         distance = self.location.distance(self, site.landmark.coordinates)
         return 10 - distance
 
+    def site_preferences(self, sites):
+        distances = self.location.point_distances(
+            self, [site.landmark.coordinates for site in sites]
+        )
+        return [10 - distance for distance in distances]
+
     def own_site_preference(self):
         return 7.5
 
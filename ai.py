@@ -74,7 +74,7 @@ class AI(Routine):
     def taking_hostile_action(self):
         act = self.get_current_action()
         if act is not None:
-            self_hostile = getattr(act, "is_hostile", False)
+            self_hostile = act.is_hostile
             # we shouldn't ask to interrupt the player's attacks.
             return self_hostile
         else:
@@ -126,12 +126,14 @@ class WaitingMonsterAI(AI):
 
 
 class WanderingMonsterAI(AI):
+    interests = frozenset({"movement"})
+
     def is_hostile_to(self, other):
         return other.has_trait(trait.hero)
 
     def hear_announcement(self, act):
         super().hear_announcement(act)
-        if getattr(act, "traverses_portals", False):
+        if act.traverses_portals:
             if act.actor.has_trait(trait.hero):
                 self.cancel_actions()
 
@@ -321,6 +323,8 @@ class SquadAI(AI):
 
 
 class PeacefulAI(AI):
+    interests = frozenset({"movement", "hostile"})
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.present_enemies = set()
@@ -353,7 +357,7 @@ class PeacefulAI(AI):
                 self.actor_enters_location(act)
             else:
                 self.actor_leaves_location(act)
-        elif getattr(act, "is_hostile", False):
+        elif act.is_hostile:
             self.hostile_action_taken(act)
 
     class CombatRoutine(action.Routine, action.ZeroTargetAction):
@@ -381,6 +385,7 @@ class PeacefulAI(AI):
 
 
 class PrisonerAI(PeacefulAI):
+    interests = PeacefulAI.interests | {"locking"}
     has_seen_hero = False
     hostile_to_hero = False
 
@@ -390,7 +395,7 @@ class PrisonerAI(PeacefulAI):
     def hear_announcement(self, action):
         super().hear_announcement(action)
         if (
-               getattr(action, "locks_things", False)
+               action.locks_things
                and action.desired_state == False
                and action.target == self.actor.trapping_item
            ):
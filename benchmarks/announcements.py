@@ -0,0 +1,89 @@
+"""Cost of broadcasting an action to a crowded location.
+
+Run from the repository root:
+
+    python -m benchmarks.announcements [actors ...]
+
+Each run fills an ordinary location, and an overworld of world.Random's
+size, with the given number of wandering monsters, then times one of them
+waiting over and over, announcing each wait to everyone around. On the
+overworld it is timed again with a monster taking a step before each
+announcement, as happens while travelling overland. The original broadcast, which rebuilt the set of subscribers on every
+announcement, is timed alongside for comparison (see benchmarks.baseline).
+"""
+import random
+import sys
+from time import perf_counter
+
+import action
+import actor
+import ai
+from benchmarks import baseline
+from location import Location
+from schedule import Schedule
+from wide import Overworld
+
+ANNOUNCEMENTS = 2000
+
+
+def crowd(location, actors, spread):
+    members = []
+    for i in range(actors):
+        coordinates = None
+        if spread:
+            coordinates = (random.uniform(0, 50), random.uniform(0, 50))
+        monster = actor.Person(
+            location=location,
+            coordinates=coordinates,
+            name="monster {}".format(i),
+            sched=location.schedule,
+        )
+        ai.WanderingMonsterAI(monster)
+        members.append(monster)
+    return members
+
+
+def rate(broadcast, location, speaker, walkers=()):
+    wait = action.Wait(speaker)
+    start = perf_counter()
+    for i in range(ANNOUNCEMENTS):
+        if walkers:
+            walker = walkers[i % len(walkers)]
+            x, y = walker.coordinates
+            walker.change_coordinates((x, y + random.uniform(-1, 1)))
+        broadcast(location, wait)
+    return ANNOUNCEMENTS / (perf_counter() - start)
+
+
+def main(sizes):
+    random.seed(1)
+    print(
+        f"{'actors':>7} {'room new/s':>11} {'original/s':>11} "
+        f"{'overworld new/s':>16} {'original/s':>11} "
+        f"{'walking new/s':>14} {'original/s':>11}"
+    )
+    for size in sizes:
+        room = Location(sched=Schedule(), description="A crowded hall.")
+        speaker = crowd(room, size, spread=False)[0]
+        room_new = rate(Location.broadcast_announcement, room, speaker)
+        room_old = rate(baseline.broadcast_announcement, room, speaker)
+        overworld = Overworld(sched=Schedule(), width=50, height=50)
+        walkers = crowd(overworld, size, spread=True)
+        speaker = walkers[0]
+        wide_new = rate(Overworld.broadcast_announcement, overworld, speaker)
+        wide_old = rate(baseline.broadcast_announcement, overworld, speaker)
+        walk_new = rate(
+            Overworld.broadcast_announcement, overworld, speaker, walkers
+        )
+        walk_old = rate(
+            baseline.broadcast_announcement, overworld, speaker, walkers
+        )
+        print(
+            f"{size:>7} {room_new:>11.0f} {room_old:>11.0f} "
+            f"{wide_new:>16.0f} {wide_old:>11.0f} "
+            f"{walk_new:>14.0f} {walk_old:>11.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [50, 200, 1000])
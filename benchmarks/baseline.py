@@ -0,0 +1,88 @@
+"""Code from the baseline commit (bd0b296) that the benchmarks time the
+current implementations against.
+
+Each piece is as it was there, apart from being pulled out of its class
+into a plain function or class that the benchmarks can call directly.
+"""
+import trait
+
+
+class SortedEventList:
+    """Schedule's event list: kept sorted, latest first, by a linear scan."""
+
+    def __init__(self):
+        self.event_list = []
+
+    def __len__(self):
+        return len(self.event_list)
+
+    def push(self, new_event):
+        if new_event.is_instant:
+            self.event_list.append(new_event)
+        else:
+            i = 0
+            try:
+                while self.event_list[i].time > new_event.time:
+                    i += 1
+                self.event_list.insert(i, new_event)
+            except IndexError:
+                self.event_list.append(new_event)
+
+    def pop(self):
+        return self.event_list.pop()
+
+
+def broadcast_announcement(location, act):
+    """Location.broadcast_announcement, which rebuilt the set of
+    subscribers for every announcement."""
+    target_set = set(act.target_list)
+    subscribers = location.things_with_trait(trait.listener) | target_set
+    for sub in subscribers:
+        if sub in target_set or location.line_of_sight(sub, act.actor):
+            sub.hear_announcement(act)
+
+
+def a_star(start, goal):
+    """UndergroundRegion.a_star, which picked the next node with min() over
+    its open set."""
+    open_set = set()
+    closed_set = set()
+    current = start
+    g, h, parent = {}, {}, {}
+    open_set.add(current)
+    while open_set:
+        current = min(open_set, key=lambda x: g.get(x, 0) + h.get(x, 0))
+        if current == goal:
+            path = []
+            while parent.get(current, None):
+                path.append(current)
+                current = parent.get(current, None)
+            return path
+        open_set.remove(current)
+        closed_set.add(current)
+        for node in current.connected_nodes:
+            if node in closed_set:
+                continue
+            if node in open_set:
+                new_g = g.get(current, 0) + 1
+                if g.get(node, 0) > new_g:
+                    g[node] = new_g
+                    parent[node] = current
+            else:
+                g[node] = g.get(current, 0) + 1
+                h[node] = node.manhattan(goal)
+                parent[node] = current
+                open_set.add(node)
+    raise ValueError("No path found")
+
+
+def path_to_goal(region, start, goal):
+    """UndergroundRegion.path_to_goal, which searched again on every call."""
+    path = a_star(start, goal)
+    current = start
+    portals = []
+    while path:
+        nxt = path.pop()
+        portals.append(region.portal_with_endpoints(current, nxt))
+        current = nxt
+    return portals
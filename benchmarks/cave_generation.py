@@ -0,0 +1,48 @@
+"""Attempts and time it takes to generate each kind of cave region.
+
+Run from the repository root:
+
+    python -m benchmarks.cave_generation [regions]
+
+Caves grows random maps until one has enough rooms, forks and dead ends.
+Every Caves subclass is built the given number of times, from a fixed
+seed. Logging is turned off, so the timings are those of generation, not
+of writing rejected maps out.
+"""
+import logging
+import random
+import sys
+from time import perf_counter
+
+import region
+from schedule import Schedule
+
+REGIONS = 200
+
+
+def all_subclasses(cls):
+    for subclass in cls.__subclasses__():
+        yield subclass
+        yield from all_subclasses(subclass)
+
+
+def measure(region_type, count):
+    random.seed(1)
+    attempts = 0
+    start = perf_counter()
+    for _ in range(count):
+        attempts += region_type(sched=Schedule()).attempts
+    seconds = perf_counter() - start
+    return attempts / count, 1000 * seconds / count
+
+
+def main(count):
+    logging.disable(logging.CRITICAL)
+    print(f"{'region':>16} {'attempts':>9} {'ms':>7}")
+    for region_type in all_subclasses(region.Caves):
+        attempts, ms = measure(region_type, count)
+        print(f"{region_type.__name__:>16} {attempts:>9.2f} {ms:>7.2f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if sys.argv[1:] else REGIONS)
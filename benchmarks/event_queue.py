@@ -0,0 +1,49 @@
+"""Throughput of the schedule's event queue with many pending events.
+
+Run from the repository root:
+
+    python -m benchmarks.event_queue [pending ...]
+
+Each run fills a schedule with the given number of pending events, then
+times a steady state of popping the next event and scheduling a new one,
+the way actors reschedule themselves in Schedule.run_game.  The old
+sorted-list insertion is timed alongside for comparison (see
+benchmarks.baseline).
+"""
+import sys
+from random import Random
+from time import perf_counter
+
+from benchmarks import baseline
+from schedule import Event, EventQueue, Schedule
+
+OPERATIONS = 20000
+
+
+def churn(queue_type, pending, operations=OPERATIONS, seed=1):
+    rng = Random(seed)
+    schedule = Schedule()
+    schedule.event_queue = queue_type()
+    for _ in range(pending):
+        Event(schedule, rng.randint(0, 1000 * 60))
+    start = perf_counter()
+    for _ in range(operations):
+        event = schedule.event_queue.pop()
+        schedule.current_time = event.time
+        Event(schedule, event.time + rng.randint(1, 1000 * 60))
+    return operations / (perf_counter() - start)
+
+
+def main(sizes):
+    print(f"{'pending':>8} {'heap ops/s':>12} {'list ops/s':>12} {'speedup':>8}")
+    for pending in sizes:
+        heap_rate = churn(EventQueue, pending)
+        list_rate = churn(baseline.SortedEventList, pending)
+        print(
+            f"{pending:>8} {heap_rate:>12.0f} {list_rate:>12.0f} "
+            f"{heap_rate / list_rate:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1000, 10000, 50000])
@@ -0,0 +1,95 @@
+"""Radius and visibility queries on overworlds of growing size.
+
+Run from the repository root:
+
+    python -m benchmarks.overworld_queries [scale ...]
+
+A scale of 1 is world.Random's 50x50 map with a few hundred things on it;
+larger scales grow the map's area and its population together, so density
+stays the same. Each query is timed through the Overworld's spatial grid
+and through the old scan over every thing with the trait; "nearest" finds
+the five towns closest to a point through the Overworld's position store.
+"""
+import random
+import sys
+from time import perf_counter
+
+import trait
+from game_object import Thing
+from location import Location
+from schedule import Schedule
+from wide import Overworld
+
+QUERIES = 2000
+THINGS_PER_SCALE = 300
+
+
+def build(scale):
+    side = 50 * scale ** 0.5
+    overworld = Overworld(sched=Schedule(), width=side, height=side)
+    for i in range(THINGS_PER_SCALE * scale):
+        thing = Thing(location=overworld, coordinates=overworld.random_point())
+        thing.traits.add(trait.portal() if i % 3 else trait.town())
+    viewer = Thing(location=overworld, coordinates=overworld.random_point())
+    return overworld, viewer
+
+
+def scan_with_trait(overworld, trait_type, center, radius):
+    return {
+        x for x in Location.things_with_trait(overworld, trait_type)
+        if overworld.distance(x, center) < radius
+    }
+
+
+def scan_nearest(overworld, trait_type, center, k):
+    things = Location.things_with_trait(overworld, trait_type)
+    return sorted(things, key=lambda x: overworld.distance(x, center))[:k]
+
+
+def scan_in_view(overworld, viewer):
+    return {t for t in overworld.things if overworld.line_of_sight(viewer, t)}
+
+
+def rate(query, points):
+    start = perf_counter()
+    for point in points:
+        query(point)
+    return len(points) / (perf_counter() - start)
+
+
+def main(scales):
+    random.seed(1)
+    print(
+        f"{'scale':>6} {'things':>7} {'radius grid/s':>14} {'scan/s':>10} "
+        f"{'view grid/s':>12} {'scan/s':>10} "
+        f"{'nearest/s':>10} {'scan/s':>10}"
+    )
+    for scale in scales:
+        overworld, viewer = build(scale)
+        points = [overworld.random_point() for _ in range(QUERIES)]
+        # The scans are slow at large scales, so they get fewer queries
+        few_points = points[:QUERIES // 20]
+        grid = rate(
+            lambda p: overworld.things_with_trait(trait.portal, p, 10), points
+        )
+        scan = rate(
+            lambda p: scan_with_trait(overworld, trait.portal, p, 10),
+            few_points,
+        )
+        view_grid = rate(lambda p: overworld.things_in_view(viewer), points)
+        view_scan = rate(lambda p: scan_in_view(overworld, viewer), few_points)
+        nearest = rate(
+            lambda p: overworld.nearest_with_trait(trait.town, p, 5), few_points
+        )
+        nearest_scan = rate(
+            lambda p: scan_nearest(overworld, trait.town, p, 5), few_points
+        )
+        print(
+            f"{scale:>6} {len(overworld.things):>7} {grid:>14.0f} "
+            f"{scan:>10.0f} {view_grid:>12.0f} {view_scan:>10.0f} "
+            f"{nearest:>10.0f} {nearest_scan:>10.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1, 10, 100])
@@ -0,0 +1,92 @@
+"""Shortest paths through dungeon regions of growing size.
+
+Run from the repository root:
+
+    python -m benchmarks.pathfinding [nodes ...]
+
+Each region is grown the way Caves grows its maps, by breeding random
+nodes, until it has the given number of nodes. Paths are then found
+between random pairs of nodes with the heap-based a_star, with the
+breadth first search, and with the original a_star from
+benchmarks.baseline, which picked the next node with min() over its open
+set. "routed" is path_to_goal, as a hunting
+population uses it: every node heads for one of a few goals, and is given
+the portals to take along the way from the region's routing table.
+"""
+import random
+import sys
+from functools import partial
+from time import perf_counter
+
+from benchmarks import baseline
+from region import (
+    Connection, Node, UndergroundRegion, direction_vector, directions,
+)
+from vector import Vector
+
+PAIRS = 200
+
+
+def grow(size):
+    """A region grown like Caves.breed_repeatedly, without the room types."""
+    region = UndergroundRegion()
+    by_coords = {(0, 0): Node(region, Vector((0, 0)))}
+    unbred = list(by_coords.values())
+    while len(by_coords) < size:
+        node = unbred.pop(random.randrange(len(unbred)))
+        for d in random.sample(directions, random.randint(1, 3)):
+            vector = node.vector + direction_vector[d.letter]
+            found = by_coords.get(vector.coords)
+            if found is None:
+                found = by_coords[vector.coords] = Node(region, vector, node, d)
+                unbred.append(found)
+            elif (
+                found not in node.connected_nodes
+                and random.random() < region.reconnect_probability
+            ):
+                Connection(region, node, found, d)
+        if not unbred:
+            unbred = list(by_coords.values())
+    region.build_blank_locations()
+    region.build_portals()
+    return region
+
+
+def rate(find_path, pairs):
+    start = perf_counter()
+    for first, second in pairs:
+        find_path(first, second)
+    return len(pairs) / (perf_counter() - start)
+
+
+def main(sizes):
+    random.seed(1)
+    print(
+        f"{'nodes':>6} {'mean length':>12} {'a_star/s':>9} "
+        f"{'bfs/s':>9} {'original/s':>11} "
+        f"{'routed/s':>9} {'original/s':>11}"
+    )
+    for size in sizes:
+        region = grow(size)
+        pairs = [
+            tuple(random.sample(region.node_list, 2)) for _ in range(PAIRS)
+        ]
+        lengths = [len(region.a_star(*pair)) for pair in pairs]
+        assert lengths == [len(region.breadth_first_path(*p)) for p in pairs]
+        # The original is too slow to run on every pair at large sizes
+        few_pairs = pairs[:max(5, PAIRS * 50 // size)]
+        goals = random.sample(region.node_list, 3)
+        hunts = [(node, goal) for goal in goals for node in region.node_list]
+        few_hunts = hunts[:len(few_pairs)]
+        print(
+            f"{size:>6} {sum(lengths) / len(lengths):>12.1f} "
+            f"{rate(region.a_star, pairs):>9.0f} "
+            f"{rate(region.breadth_first_path, pairs):>9.0f} "
+            f"{rate(baseline.a_star, few_pairs):>11.1f} "
+            f"{rate(region.path_to_goal, hunts):>9.0f} "
+            f"{rate(partial(baseline.path_to_goal, region), few_hunts):>11.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [50, 500, 5000])
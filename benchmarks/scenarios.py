@@ -0,0 +1,135 @@
+"""End to end timings and peak memory of whole-game scenarios.
+
+Run from the repository root:
+
+    python -m benchmarks.scenarios [--repeat N] [--output results.json]
+
+Every scenario starts from a fixed seed and runs without a terminal: game
+output is discarded, and the hero's commands come from a script. Results
+are written as JSON (to stdout, unless --output is given), so runs from
+different releases can be compared.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import tempfile
+import tracemalloc
+from time import perf_counter
+
+import agent
+import sites
+import world
+from input_providers import ScriptedInput
+from save_manager import SaveManager
+
+SEED = "benchmark"
+
+HERO_SESSION = [
+    "go to kobold caves",
+    "enter slope",
+    "m",
+    "wait for one minute",
+    "hit kobold",
+    "hit kobold",
+    "hit kobold",
+    "hit kobold",
+    "m",
+    "<<save>>",
+    "quit",
+]
+
+
+def random_world():
+    world.Random()
+
+
+def population_test():
+    world.PopulationTest(sites.Hive, agent.GiantAntSwarm)
+
+
+def static_world():
+    world.Static()
+
+
+def hero_session():
+    with tempfile.TemporaryDirectory() as save_directory:
+        os.environ["TEXTADV_SAVE_DIR"] = save_directory
+        try:
+            static = world.Static(save_manager=SaveManager())
+            static.actor.ai.input_source = ScriptedInput(HERO_SESSION)
+            try:
+                static.run_game()
+            except EOFError:
+                # Interrupt prompts can use up the script before "quit"
+                pass
+        finally:
+            del os.environ["TEXTADV_SAVE_DIR"]
+
+
+SCENARIOS = {
+    "random_world": random_world,
+    "population_test": population_test,
+    "static_world": static_world,
+    "hero_session": hero_session,
+}
+
+
+def run_quietly(scenario):
+    random.seed(SEED)
+    with contextlib.redirect_stdout(io.StringIO()):
+        scenario()
+
+
+def measure(scenario, repeat):
+    seconds = []
+    for _ in range(repeat):
+        start = perf_counter()
+        run_quietly(scenario)
+        seconds.append(perf_counter() - start)
+    # Memory is traced in a run of its own, as tracing slows everything down
+    tracemalloc.start()
+    try:
+        run_quietly(scenario)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "seconds": seconds,
+        "best_seconds": min(seconds),
+        "peak_memory_bytes": peak,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output")
+    parser.add_argument("scenarios", nargs="*", help="default: all of them")
+    args = parser.parse_args(argv)
+    for name in args.scenarios:
+        if name not in SCENARIOS:
+            parser.error("unknown scenario {!r}".format(name))
+
+    results = {
+        "python": platform.python_version(),
+        "seed": SEED,
+        "repeat": args.repeat,
+        "scenarios": {
+            name: measure(SCENARIOS[name], args.repeat)
+            for name in args.scenarios or SCENARIOS
+        },
+    }
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
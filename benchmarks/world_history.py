@@ -0,0 +1,64 @@
+"""Startup time of world.Random with and without the fast history mode.
+
+Run from the repository root:
+
+    python -m benchmarks.world_history [seeds]
+
+Each seed builds one world through Schedule.run_history and one through
+the full run_game event machinery.  Alongside the timings, the outcomes of
+the 250 days of history are tallied for both paths, so the two
+distributions can be compared.
+"""
+import contextlib
+import io
+import random
+import sys
+from statistics import mean
+from time import perf_counter
+
+import agent
+import world
+
+
+def outcomes(random_world):
+    overworld = random_world.actor.location
+    towns = [t for t in overworld.things if isinstance(t, agent.Town)]
+    return {
+        "tombs": sum(town.tomb_count for town in towns),
+        "bandit gangs": sum(
+            isinstance(t, agent.BanditGroup) for t in overworld.things
+        ),
+        "destroyed towns": sum(town.destroyed for town in towns),
+    }
+
+
+def build(seed, fast_history):
+    random.seed(seed)
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = perf_counter()
+        random_world = world.Random(fast_history=fast_history)
+        elapsed = perf_counter() - start
+    return elapsed, outcomes(random_world)
+
+
+def main(seeds):
+    results = {True: [], False: []}
+    for seed in range(seeds):
+        for fast_history in results:
+            results[fast_history].append(build(seed, fast_history))
+
+    print(f"{'':>16} {'run_history':>12} {'run_game':>12}")
+    fast, full = results[True], results[False]
+    print(
+        f"{'startup (s)':>16} {mean(t for t, _ in fast):>12.3f} "
+        f"{mean(t for t, _ in full):>12.3f}"
+    )
+    for key in fast[0][1]:
+        print(
+            f"{key:>16} {mean(o[key] for _, o in fast):>12.2f} "
+            f"{mean(o[key] for _, o in full):>12.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
@@ -65,10 +65,14 @@ class MaximizeFunction(Preference):
     def profit(self, node):
         raise NotImplementedError
 
+    def profits(self, candidate_list):
+        return [self.profit(candidate) for candidate in candidate_list]
+
     def refined_list(self, candidate_list):
-        best = max(candidate_list, key=self.profit)
-        return [candidate for candidate in candidate_list
-                if self.profit(candidate) == self.profit(best)]
+        profits = self.profits(candidate_list)
+        best = max(profits)
+        return [candidate for candidate, profit in zip(candidate_list, profits)
+                if profit == best]
 
 
 class AvoidRoom(MaximizeFunction):
@@ -76,16 +80,25 @@ class AvoidRoom(MaximizeFunction):
         self.avoided_room = avoided_room
 
     def profit(self, node):
+        return self.profits([node])[0]
+
+    def profits(self, candidate_list):
+        region = candidate_list[0].region
         try:
-            return node.distance_from_type(self.avoided_room)
+            field = region.distances_from_type(self.avoided_room)
         except MissingNode:
-            return 0
+            return [0] * len(candidate_list)
+        return [field[node] for node in candidate_list]
 
 
 class AvoidEntrance(MaximizeFunction):
     def profit(self, node):
         return node.distance_from_entrance()
 
+    def profits(self, candidate_list):
+        field = candidate_list[0].region.distances_from_entrance()
+        return [field[node] for node in candidate_list]
+
 
 class ReplaceRoomType(MaximizeFunction):
     def __init__(self, replaced_type, avoid=False):
@@ -6,6 +6,13 @@ class Field:
     def probability(self, actor, x, y):
         return 0
 
+    def bounding_box(self):
+        """(x_min, y_min, x_max, y_max) outside of which probability is 0.
+
+        None means the field may reach anywhere.
+        """
+        return None
+
     def targets_actor(self, actor):
         return actor.physical
 
@@ -29,6 +36,13 @@ class Disk(Field):
         else:
             return 0
 
+    def bounding_box(self):
+        x, y = self.center
+        return (
+            x - self.radius, y - self.radius,
+            x + self.radius, y + self.radius,
+        )
+
 
 class HelloDisk(Disk):
     def affect_actor(self, actor):
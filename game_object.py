@@ -44,24 +44,37 @@ class Landmark:
 
 
 class Thing:
+    # Bumped whenever something here, or in a container here, arrives,
+    # leaves, or changes whether it can be seen or reached
+    generation = 0
+    # Results of get_interactables and get_valid_targets for viewers here,
+    # for this generation, keyed by the method name and its arguments
+    view_cache = None
+    # The generation of its location when this thing last arrived there
+    arrival_generation = 0
+
     def __init__(
             self, location=None, name="", coordinates=None, other_names=(),
             sched=None, traits=(), names=(), *args, **kwargs
     ):
         self.damage_type = "blunt"
         self.damage_mult = 1
-        self.physical = True
+        # Not yet anywhere, so there is no cached view to forget
+        self._physical = True
         self.trapping_item = None
         self.coordinates = coordinates
         self.things = set()
-        self.traits = trait.TraitSet()
+        # trait type -> set of things here with that trait
+        self.trait_index = {}
+        self.listener_cache = None
+        self.traits = trait.TraitSet(owner=self)
         self.location = location
         self.original_location = location
         self.arranged = True
         self.schedule = sched
 
         if self.location is not None:
-            self.location.things.add(self)
+            self.location.add_thing(self)
             if self.schedule is None and self.location.schedule is not None:
                 self.schedule = self.location.schedule
 
@@ -79,12 +92,35 @@ class Thing:
         self.owner : Optional[Thing] = None
         self.price : Optional[int] = None
 
+    def __setstate__(self, state):
+        upgrade = "trait_index" not in state
+        if upgrade:
+            # Saved before contents were indexed by trait
+            state["_physical"] = state.pop("physical")
+            state["trait_index"] = {}
+            state["listener_cache"] = None
+        self.__dict__.update(state)
+        if upgrade:
+            self.traits.owner = self
+            # Things may be loaded before or after their location. Whichever
+            # of the two is loaded last puts the thing in the index.
+            for thing in self.things:
+                if "traits" in vars(thing):
+                    self.index_thing(thing)
+            location = self.location
+            if location is not None and "trait_index" in vars(location):
+                location.index_thing(self)
+
     def get_identifier(self, viewer=None):
         return "the "+self.get_name(viewer)
 
     def line_of_sight(self, first, second):
         return second.physical
 
+    def wants_announcement(self, action):
+        """Whether to hear action even when it isn't aimed at self."""
+        return False
+
     def hear_announcement(self, action):
         try:
             self_is_target = (action.target == self)
@@ -96,25 +132,32 @@ class Thing:
     def action_targets_self(self, action):
         pass
 
+    def listeners(self):
+        """The listeners here, as a tuple kept until one arrives or leaves."""
+        if self.listener_cache is None:
+            self.listener_cache = tuple(self.trait_index.get(trait.listener, ()))
+        return self.listener_cache
+
+    def announcement_listeners(self, source):
+        """Listeners here that might perceive an action coming from source."""
+        return self.listeners()
+
     def broadcast_announcement(self, action):
-        # This function gets hit pretty hard - should be more optimized
-        target_set = set(action.target_list)
-        subscribers = self.things_with_trait(trait.listener) | target_set
+        targets = dict.fromkeys(action.target_list)
         broadcast_source = action.actor
-        if (
-            getattr(action, "traverses_portals", False)
-            and not action.actor.has_location(self)
-        ):
+        if action.traverses_portals and not action.actor.has_location(self):
             # Departing actor: Announce from portal, not actor
             broadcast_source = action.target
-        for sub in subscribers:
+        for sub in self.announcement_listeners(broadcast_source):
+            # Targets hear it regardless of line of sight, below
             if (
-                sub in target_set
-                or self.line_of_sight(sub, broadcast_source)
+                sub not in targets
+                and sub.wants_announcement(action)
+                and self.line_of_sight(sub, broadcast_source)
             ):
-                # the order of those conditions matters:
-                # line_of_sight will throw errors on targets outside location
                 sub.hear_announcement(action)
+        for target in targets:
+            target.hear_announcement(action)
 
     def take_damage(self, amt, damage_type, perpetrator=None):
         pass
@@ -126,7 +169,7 @@ class Thing:
 
     def vanish(self):
         if self.location is not None:
-            self.location.things.remove(self)
+            self.location.remove_thing(self)
         self.location = None
 
     def materialize(self, location, coordinates=None):
@@ -134,30 +177,92 @@ class Thing:
             raise AttributeError
         self.change_location(location, coordinates)
 
+    @property
+    def physical(self):
+        return self._physical
+
+    @physical.setter
+    def physical(self, value):
+        self._physical = value
+        if self.location is not None:
+            self.location.contents_changed()
+
+    def contents_changed(self):
+        """Forget the cached views of this and of everything enclosing it."""
+        container = self
+        while container is not None:
+            container.generation += 1
+            container.view_cache = None
+            container = container.location
+
+    def cached_view(self, key, compute):
+        """compute(), kept until the contents here next change."""
+        if self.view_cache is None:
+            self.view_cache = {}
+        try:
+            return self.view_cache[key]
+        except KeyError:
+            value = self.view_cache[key] = compute()
+            return value
+
     def add_thing(self, thing, coordinates=None):
+        self.contents_changed()
+        thing.arrival_generation = self.generation
         self.things.add(thing)
+        self.index_thing(thing)
+
+    def index_thing(self, thing):
+        for trait_type in thing.traits.trait_types():
+            self.index_trait(thing, trait_type)
+
+    def remove_thing(self, thing):
+        self.contents_changed()
+        self.things.remove(thing)
+        for trait_type in thing.traits.trait_types():
+            members = self.trait_index[trait_type]
+            members.discard(thing)
+            if not members:
+                del self.trait_index[trait_type]
+            if trait_type is trait.listener:
+                self.listener_cache = None
+
+    def index_trait(self, thing, trait_type):
+        self.trait_index.setdefault(trait_type, set()).add(thing)
+        if trait_type is trait.listener:
+            self.listener_cache = None
 
     def change_location(
         self, new_location, coordinates=None, keep_arranged=False
     ):
+        # Moving within a location leaves its listeners as they were
+        listeners = None
+        if self.location is new_location:
+            listeners = new_location.listener_cache
         if self.location is not None:
-            self.location.things.remove(self)
+            self.location.remove_thing(self)
         self.location = new_location
+        # Set before add_thing, so that the new location can index them
+        self.coordinates = coordinates
         new_location.add_thing(self)
+        if listeners is not None:
+            new_location.listener_cache = listeners
         if not keep_arranged:
             self.arranged = False
         else:
             self.original_location = new_location
-        self.coordinates = coordinates
 
     U = TypeVar("U")
 
     def has_trait(self, trait: Type[U]):
-        assert type(trait) == type
-        if self.traits.contains_trait(trait):
-            return True
-        else:
-            return False
+        # Passing a trait instance instead of its type fails here too, as
+        # trait instances are unhashable.
+        return self.traits.contains_trait(trait)
+
+    def has_all_traits(self, *traits):
+        return self.traits.has_all(*traits)
+
+    def has_any_trait(self, *traits):
+        return self.traits.has_any(*traits)
 
     def has_name(self, name, viewer=None):
         if self.get_name(viewer).lower() == name.lower():
@@ -169,7 +274,15 @@ class Thing:
 
     def things_with_trait(self, trait):
         assert type(trait) == type
-        return {thing for thing in self.things if thing.has_trait(trait)}
+        return set(self.trait_index.get(trait, ()))
+
+    def things_in_view(self, viewer, trait_type=None):
+        """Things here that viewer can see, optionally only with a trait."""
+        if trait_type is None:
+            candidates = self.things
+        else:
+            candidates = self.things_with_trait(trait_type)
+        return {t for t in candidates if self.line_of_sight(viewer, t)}
 
     def things_with_name(self, name, viewer=None):
         return {thing for thing in self.things if thing.has_name(name, viewer=viewer)}
@@ -187,15 +300,23 @@ class Thing:
             return False
 
     def get_interactables(self, viewer=None):
-        '''PUBLIC: returns a list with all interactables at the location.'''
+        '''PUBLIC: returns a set with all interactables at the location.
+
+        The set is shared until something moves, so it must not be changed.
+        '''
+        return self.cached_view(
+            ("interactables", viewer),
+            lambda: self.find_interactables(viewer),
+        )
+
+    def find_interactables(self, viewer):
         output = set(self.things)
         if viewer:
             output = {t for t in output if self.line_of_sight(viewer, t)}
         nested = set()
         for thing in output:
             nested |= thing.get_interactables()
-        output |= nested
-        return output
+        return frozenset(output | nested)
 
     def has_nested_thing(self, thing):
         if self.has_thing(thing):
@@ -317,6 +438,21 @@ class Container(Item):
         self.is_open = is_open
         self.traits.add(trait.container())
 
+    def __setstate__(self, state):
+        if "is_open" in state:
+            # Saved before is_open became a property
+            state["_is_open"] = state.pop("is_open")
+        super().__setstate__(state)
+
+    @property
+    def is_open(self):
+        return self._is_open
+
+    @is_open.setter
+    def is_open(self, value):
+        self._is_open = value
+        self.contents_changed()
+
     def get_look_text(self, viewer=None):
         base = super().get_look_text(viewer)
         header = "Contents:"
@@ -334,7 +470,7 @@ class Cage(Thing):
         self.prisoners = set()
 
     def be_targeted(self, action):
-        if getattr(action, "locks_things", False):
+        if action.locks_things:
             return self.lock.locking_attempt(action)
         else:
             return super().be_targeted(action)
@@ -426,13 +562,12 @@ class PortalVertex(Thing):
 
     def be_targeted(self, action):
         debug("Portal target effects called")
-        if getattr(action, "traverses_portals", False):
-            # if action.traverses_portals == True or AttributeError
+        if action.traverses_portals:
             if self.edge.lock and self.edge.lock.locked:
                 return False, "The door is locked."
             else:
                 return super().be_targeted(action)
-        elif getattr(action, "locks_things", False):
+        elif action.locks_things:
             debug("Action detected as locking things.")
             if self.edge.lock is not None:
                 return self.lock.locking_attempt(action)
@@ -0,0 +1,50 @@
+"""Sources of commands for a Parser, other than the keyboard.
+
+Set one as parser.input_source and every prompt the parser gives (commands,
+clarifications, offers, interruptions) is answered from it instead of by
+input(). Each provider's read(prompt) returns the next line, or raises
+EOFError once there are none left, as input() does at the end of stdin.
+"""
+import queue
+
+
+class ScriptedInput:
+    """Commands taken from any iterable, such as a list or a generator."""
+
+    def __init__(self, commands):
+        self.commands = iter(commands)
+
+    def read(self, prompt):
+        try:
+            return next(self.commands)
+        except StopIteration:
+            raise EOFError("Out of scripted commands")
+
+
+class FileInput(ScriptedInput):
+    """Commands read from a text file, one per line."""
+
+    def __init__(self, path):
+        with open(path) as file:
+            super().__init__([line.rstrip("\n") for line in file])
+
+
+class QueueInput:
+    """Commands fed in through a queue.Queue, eg. from another thread.
+
+    Putting None on the queue ends the input, as does waiting longer than
+    timeout seconds for the next command.
+    """
+
+    def __init__(self, command_queue, timeout=None):
+        self.queue = command_queue
+        self.timeout = timeout
+
+    def read(self, prompt):
+        try:
+            command = self.queue.get(timeout=self.timeout)
+        except queue.Empty:
+            raise EOFError("Timed out waiting for a command")
+        if command is None:
+            raise EOFError("Input queue was closed")
+        return command
@@ -68,10 +68,9 @@ class Location(Thing):
         if full_text:
             str_list.append(self.get_description(viewer))
         for trait_type, header in category_list:
-            subset = self.things_with_trait(trait_type)
+            subset = self.things_in_view(viewer, trait_type)
             if viewer in subset:
                 subset.remove(viewer)
-            subset = {t for t in subset if self.line_of_sight(viewer, t)}
             debug(subset)
             if subset:
                 str_list.append(header)
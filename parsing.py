@@ -13,6 +13,12 @@ from logging import debug
 
 
 class Parser(AI):
+    # Optional provider of commands to use instead of the keyboard,
+    # see input_providers
+    input_source = None
+    # Optional object whose record_input is given every command read
+    input_recorder = None
+
     def __init__(self, *args, **kwargs):
         AI.__init__(self, *args, **kwargs)
         self.display_queue = []
@@ -146,6 +152,10 @@ class Parser(AI):
                     self.cancel_actions()
                     decision_made = True
 
+    def wants_announcement(self, action):
+        # The player is told about everything they can see
+        return True
+
     def hear_announcement(self, action):
         super().hear_announcement(action)
         if action.actor == self.actor:
@@ -176,6 +186,7 @@ class Parser(AI):
                 not self.taking_hostile_action(),
             )
             if all(conditions):
+                # my_action is None while a routine has nothing scheduled
                 self_hostile = getattr(my_action, "is_hostile", False)
                 # we shouldn't ask to interrupt the player's attacks.
                 if not self_hostile and action.actor.is_hostile_to(self.actor):
@@ -187,7 +198,13 @@ class Parser(AI):
             prompt = json.dumps({"type": "output complete"})+"\n"
         else:
             prompt = ">"
-        output = input(prompt).lower()
+        if self.input_source is None:
+            output = input(prompt)
+        else:
+            output = self.input_source.read(prompt)
+        if self.input_recorder is not None:
+            self.input_recorder.record_input(output)
+        output = output.lower()
         # for ch in string.punctuation:
         #     output = output.replace(ch, "")
         output = output.replace(" the ", " ")
@@ -0,0 +1,67 @@
+"""Build region sites before the hero gets to them.
+
+Attach a RegionPrefetcher to a world's schedule, and it watches the hero:
+
+    prefetcher = RegionPrefetcher(world.actor, radius=5)
+    prefetcher.attach(world.schedule)
+
+__main__ does this when run with --prefetch-radius.
+"""
+import sites
+from schedule import ScheduleObserver
+from wide import Overworld
+
+
+class RegionPrefetcher(ScheduleObserver):
+    """Build a region site's region, and apply its morphs, once the hero
+    comes within radius of its landmark on an overworld.
+
+    Only its populations are left to show when the hero enters. Regions
+    grow from the seeds the sites already hold, and morphs draw from the
+    sites' own random streams, so prefetching changes when a region is
+    built, never what it looks like.
+    """
+
+    def __init__(self, hero, radius):
+        self.hero = hero
+        self.radius = radius
+        self.schedule = None
+
+    def attach(self, schedule):
+        self.schedule = schedule
+        schedule.observers.append(self)
+
+    def detach(self):
+        self.schedule.observers.remove(self)
+
+    def after_event(self, event):
+        if event.actor is self.hero:
+            for site in self.sites_in_reach():
+                self.prefetch(site)
+
+    def sites_in_reach(self):
+        location = self.hero.location
+        if not isinstance(location, Overworld):
+            return []
+        landmarks = [
+            landmark for landmark in self.hero.known_landmarks
+            if landmark.location is location and landmark.basis is not None
+        ]
+        distances = location.point_distances(
+            self.hero, [landmark.coordinates for landmark in landmarks]
+        )
+        return [
+            landmark.basis.edge.site
+            for landmark, distance in zip(landmarks, distances)
+            if distance < self.radius
+        ]
+
+    def prefetch(self, site):
+        if (
+            not isinstance(site, sites.RegionSite)
+            # Sites from saves older than per-site seeds are built on entry
+            or site.region_seed is None
+            or (site.region is not None and not site.unused_morphs())
+        ):
+            return
+        site.prepare_region()
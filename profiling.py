@@ -0,0 +1,82 @@
+"""Where the simulation spends its time, measured from inside run_game.
+
+Attach a Profiler to a schedule, play, then print profiler.report():
+
+    profiler = Profiler()
+    profiler.attach(schedule)
+
+__main__ does this when run with --profile, or with TEXTADV_PROFILE set.
+"""
+from collections import Counter, defaultdict
+from time import perf_counter
+
+from schedule import ScheduleObserver
+
+
+class Profiler(ScheduleObserver):
+    def __init__(self, sample_every=100, top_actors=10):
+        self.sample_every = sample_every
+        self.top_actors = top_actors
+        self.schedule = None
+        self.event_counts = Counter()
+        self.event_times = defaultdict(float)
+        self.actor_times = defaultdict(float)
+        self.queue_lengths = []
+        self.events_seen = 0
+        self.first_time = None
+        self.last_time = None
+        self.started = None
+
+    def attach(self, schedule):
+        self.schedule = schedule
+        schedule.observers.append(self)
+
+    def detach(self):
+        self.schedule.observers.remove(self)
+
+    def before_event(self, event):
+        if self.first_time is None:
+            self.first_time = event.time
+        if self.events_seen % self.sample_every == 0:
+            self.queue_lengths.append(len(self.schedule.event_queue))
+        self.started = perf_counter()
+
+    def after_event(self, event):
+        elapsed = perf_counter() - self.started
+        kind = type(event).__name__
+        self.event_counts[kind] += 1
+        self.event_times[kind] += elapsed
+        self.actor_times[event.actor] += elapsed
+        self.events_seen += 1
+        self.last_time = event.time
+
+    def events_per_simulated_second(self):
+        if self.first_time is None or self.last_time == self.first_time:
+            return 0.0
+        # Schedule times are in milliseconds
+        return self.events_seen / ((self.last_time - self.first_time) / 1000)
+
+    def report(self):
+        lines = ["{:<20} {:>10} {:>12}".format("event", "count", "seconds")]
+        for kind, count in self.event_counts.most_common():
+            lines.append("{:<20} {:>10} {:>12.4f}".format(
+                kind, count, self.event_times[kind]
+            ))
+        lines.append("")
+        lines.append("events per simulated second: {:.2f}".format(
+            self.events_per_simulated_second()
+        ))
+        if self.queue_lengths:
+            lines.append("queue length: min {}, mean {:.1f}, max {}".format(
+                min(self.queue_lengths),
+                sum(self.queue_lengths) / len(self.queue_lengths),
+                max(self.queue_lengths),
+            ))
+        lines.append("")
+        lines.append("top actors by time in happen():")
+        busiest = sorted(
+            self.actor_times.items(), key=lambda item: item[1], reverse=True
+        )
+        for actor, seconds in busiest[:self.top_actors]:
+            lines.append("{:<40} {:>12.4f}".format(repr(actor), seconds))
+        return "\n".join(lines)
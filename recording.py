@@ -0,0 +1,115 @@
+"""Record the events of a game to a trace, and replay games against one.
+
+A trace is a JSON lines file. The first line is a header holding the
+random seed the world was built from, and the options it was built with
+(the keyword arguments given to world.Random). Each line after that is
+one of:
+
+    ["event", time, actor, event class, action class, location, coordinates]
+    ["input", command]
+
+Actors are numbered in the order they first appear. The location and
+coordinates are the actor's after the event has happened.
+
+Replaying builds a world from the same seed and options, feeds it the
+recorded commands, and compares the new trace with the old one line by
+line. Some game logic, such as exit listings and clarification letters,
+still walks sets of objects, in memory-address order. If a replay
+diverges there, pinning the address layout too (eg. PYTHONHASHSEED=0
+under setarch -R) rules that out.
+"""
+import io
+import json
+
+from input_providers import ScriptedInput
+from schedule import ScheduleObserver
+
+
+class TraceRecorder(ScheduleObserver):
+    def __init__(self, stream, seed, options=None):
+        self.stream = stream
+        self.actor_ids = {}
+        self.write({"seed": seed, "options": options or {}})
+
+    def write(self, entry):
+        self.stream.write(json.dumps(entry) + "\n")
+
+    def attach(self, world):
+        world.schedule.observers.append(self)
+        world.actor.ai.input_recorder = self
+
+    def detach(self, world):
+        world.schedule.observers.remove(self)
+        world.actor.ai.input_recorder = None
+
+    def actor_id(self, actor):
+        return self.actor_ids.setdefault(actor, len(self.actor_ids))
+
+    def after_event(self, event):
+        actor = event.actor
+        action = getattr(event, "action", None)
+        location = getattr(actor, "location", None)
+        self.write([
+            "event",
+            event.time,
+            self.actor_id(actor),
+            type(event).__name__,
+            None if action is None else type(action).__name__,
+            None if location is None else repr(location),
+            getattr(actor, "coordinates", None),
+        ])
+
+    def record_input(self, text):
+        self.write(["input", text])
+
+
+class Trace:
+    def __init__(self, seed, entries, options=None):
+        self.seed = seed
+        self.entries = entries
+        self.options = options or {}
+
+    @classmethod
+    def read(cls, stream):
+        lines = [json.loads(line) for line in stream if line.strip()]
+        # Traces written before options were recorded have none
+        header = lines[0]
+        return cls(header["seed"], lines[1:], header.get("options"))
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as file:
+            return cls.read(file)
+
+    def inputs(self):
+        return [entry[1] for entry in self.entries if entry[0] == "input"]
+
+    def first_mismatch(self, other):
+        """Index of the first entry where the traces differ, or None."""
+        for i, (mine, theirs) in enumerate(zip(self.entries, other.entries)):
+            if mine != theirs:
+                return i
+        if len(self.entries) != len(other.entries):
+            return min(len(self.entries), len(other.entries))
+        return None
+
+    def replay(self, world):
+        """Play the recorded commands in world, and trace it anew.
+
+        The world must already have been built from self.seed, with
+        self.options. Returns the trace of the replay.
+        """
+        stream = io.StringIO()
+        recorder = TraceRecorder(stream, self.seed, self.options)
+        recorder.attach(world)
+        world.actor.ai.input_source = ScriptedInput(self.inputs())
+        try:
+            world.run_game()
+        except EOFError:
+            # The recorded session ran out of commands
+            pass
+        finally:
+            recorder.detach(world)
+            world.actor.ai.input_source = None
+        stream.seek(0)
+        return Trace.read(stream)
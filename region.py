@@ -1,10 +1,15 @@
 import random
 from random import random, randint, sample, shuffle, choice
+from random import getstate, setstate, seed
+from collections import deque
+from contextlib import contextmanager
+from heapq import heappop, heappush
+from itertools import count
 from typing import *
 from collections.abc import Iterable as AbcIterable
 import errors
 import location
-from direction import north, south, east, west
+from direction import north, south, east, west, letter_dict
 import spells
 from name_object import Name
 from vector import Vector
@@ -21,6 +26,23 @@ logging.basicConfig(level=logging.DEBUG, format='%(message)s')
 directions = [north, south, east, west]
 
 
+@contextmanager
+def seeded_random(seed_or_state):
+    """Run a block on its own random stream, then resume the global one.
+
+    Accepts either a seed or a state returned by random.getstate().
+    """
+    saved_state = getstate()
+    if isinstance(seed_or_state, tuple):
+        setstate(seed_or_state)
+    else:
+        seed(seed_or_state)
+    try:
+        yield
+    finally:
+        setstate(saved_state)
+
+
 class InfiniteDeck(AbcIterable):
     def __init__(self, lst : Sequence[Type[dungeonrooms.GeneratedRoom]]):
         self.lst = lst
@@ -65,11 +87,23 @@ class CreaturePolicy:
 
 class UndergroundRegion:
     reconnect_probability = 0.5
+    # The next hops of shortest paths: goal node -> {node: (portal vertex,
+    # next node)}. Filled in for each goal when first asked for, and thrown
+    # away when the region's rooms or connections change.
+    routes = None
+    # Breadth first distances to every node: "entrance" or a room type ->
+    # {node: distance}. Thrown away when a node's room or the graph changes.
+    distance_fields = None
 
     def __init__(self, sched=None, entrance_portal=None):
         self.node_list = []
         self.connection_list = []
         self.unbred_nodes = []
+        # Indexes onto node_list and connection_list
+        self.nodes_by_coords = {}
+        self.connections_by_endpoints = {}  # frozenset of two nodes -> connection
+        self.nodes_by_location = {}
+        self.nodes_by_type = {}  # room type -> {node: None}
         self.inhabitants = set()
         self.schedule = sched
         self.entrance_portal = entrance_portal
@@ -155,10 +189,13 @@ class UndergroundRegion:
         return out
 
     def _nodes_with_type(self, room_type):
-        return [
-            node for node in self.node_list
-            if isinstance(node.location, room_type)
+        candidates = [
+            node for node_type, nodes in self.nodes_by_type.items()
+            if issubclass(node_type, room_type)
+            for node in nodes
         ]
+        candidates.sort(key=lambda node: node.index)
+        return candidates
 
     def node_with_type(self, room_type, randomize=False):
         candidates = self._nodes_with_type(room_type)
@@ -173,21 +210,33 @@ class UndergroundRegion:
         return self.node_with_type(room_type, randomize).location
 
     def register_node(self, node):
+        assert node.coords not in self.nodes_by_coords
+        node.index = len(self.node_list)
         self.node_list.append(node)
         self.unbred_nodes.append(node)
+        self.nodes_by_coords[node.coords] = node
+        self.routes = None
+        self.distance_fields = None
 
     def register_connection(self, connection):
+        endpoints = frozenset((connection.start, connection.end))
+        assert endpoints not in self.connections_by_endpoints
         self.connection_list.append(connection)
+        self.connections_by_endpoints[endpoints] = connection
+        self.routes = None
+        self.distance_fields = None
+
+    def index_location(self, node, old_location):
+        """Move node's entries in the location indexes from old_location."""
+        if old_location is not None:
+            del self.nodes_by_location[old_location]
+            del self.nodes_by_type[type(old_location)][node]
+        self.nodes_by_location[node.location] = node
+        self.nodes_by_type.setdefault(type(node.location), {})[node] = None
+        self.distance_fields = None
 
     def connection_with_endpoints(self, start, end):
-        candidates = [c for c in self.connection_list
-                      if (c.start == start and c.end == end)
-                      or (c.end == start and c.start == end)]
-        assert len(candidates) <= 1
-        try:
-            return candidates[0]
-        except IndexError:
-            return None
+        return self.connections_by_endpoints.get(frozenset((start, end)))
 
     def build_blank_locations(self):
         for index, node in enumerate(self.node_list):
@@ -225,58 +274,114 @@ class UndergroundRegion:
         return self.nodes_with_connections(3) + self.nodes_with_connections(4)
 
     def node_with_vector(self, vec):
-        candidates = [n for n in self.node_list
-                      if n.vector.coords == vec.coords]
-        assert len(candidates) <= 1
-        try:
-            return candidates[0]
-        except IndexError:
-            return None
+        return self.nodes_by_coords.get(vec.coords)
 
     def location_a_star(self, start, goal):
         start_node = start.map_node
         goal_node = goal.map_node
         return self.a_star(start_node, goal_node)
 
+    @staticmethod
+    def retrace(parent, goal):
+        """The path to goal in parent's search tree, from goal backwards,
+        leaving out the start of the search."""
+        path = []
+        current = goal
+        while parent[current] is not None:
+            path.append(current)
+            current = parent[current]
+        return path
+
     def a_star(self, start, goal):
+        """A shortest path from start to goal.
+
+        Returns the nodes on it after start, from goal backwards. Every
+        connection has length 1, and nodes sit on a unit grid, so the
+        manhattan distance never overestimates and each node only needs
+        expanding once. Ties are broken by the order nodes were reached in.
+        """
         assert start, goal in self.node_list
-        open_set = set()  # nodes on "to do list"
-        closed_set = set()  # set of nodes ruled out
-        current = start  # node currently under consideration
-        g, h, parent = {}, {}, {}  # dictionaries for storing node properties
-        # g = current fastest path from from start to node
-        # h = manhattan distance from node to goal
-        # start --- g --- current ~~~ h ~~~ goal
-        open_set.add(current)  # add current node to the to do list.
-        while open_set:  # until no nodes are on to do list,
-            # move to the "most promising" node on to do list (minimal h + g)
-            current = min(open_set, key=lambda x: g.get(x, 0) + h.get(x, 0))
-            if current == goal:  # if you've reached the goal,
-                path = []  # begin retracing your steps
-                while parent.get(current, None):
-                    path.append(current)  # by recursively adding parents
-                    current = parent.get(current, None)
-                return path
-            open_set.remove(current)
+        order = count()
+        g = {start: 0}  # current fastest path from from start to node
+        parent = {start: None}
+        closed_set = set()
+        # (g + manhattan distance to goal, order reached, node)
+        open_heap = [(start.manhattan(goal), next(order), start)]
+        while open_heap:
+            _, _, current = heappop(open_heap)
+            if current == goal:
+                return self.retrace(parent, goal)
+            if current in closed_set:
+                # A stale entry, from before a shorter path was found
+                continue
             closed_set.add(current)
+            new_g = g[current] + 1
             for node in current.connected_nodes:
-                if node in closed_set:
-                    # ignore eliminated nodes
-                    continue
-                if node in open_set:
-                    # when new path to open node found, update the g score.
-                    new_g = g.get(current, 0) + 1
-                    if g.get(node, 0) > new_g:
-                        g[node] = new_g
-                        parent[node] = current
-                else:
-                    # add brand new nodes to the to do list.
-                    g[node] = g.get(current, 0) + 1
-                    h[node] = node.manhattan(goal)
+                if node not in closed_set and new_g < g.get(node, new_g + 1):
+                    g[node] = new_g
                     parent[node] = current
-                    open_set.add(node)
-        else:
-            raise ValueError("No path found")
+                    heappush(
+                        open_heap,
+                        (new_g + node.manhattan(goal), next(order), node)
+                    )
+        raise ValueError("No path found")
+
+    @staticmethod
+    def distance_field(sources):
+        """Distance from every reachable node to the nearest of sources."""
+        distances = dict.fromkeys(sources, 0)
+        frontier = deque(distances)
+        while frontier:
+            current = frontier.popleft()
+            next_distance = distances[current] + 1
+            for node in current.connected_nodes:
+                if node not in distances:
+                    distances[node] = next_distance
+                    frontier.append(node)
+        return distances
+
+    def cached_distance_field(self, key, find_sources):
+        if self.distance_fields is None:
+            self.distance_fields = {}
+        try:
+            return self.distance_fields[key]
+        except KeyError:
+            field = self.distance_fields[key] = self.distance_field(
+                find_sources()
+            )
+            return field
+
+    def distances_from_entrance(self):
+        return self.cached_distance_field(
+            "entrance", lambda: [self.get_entrance_node()]
+        )
+
+    def distances_from_type(self, room_type):
+        """Distances to the nearest room of room_type, or MissingNode."""
+        def sources():
+            nodes = self._nodes_with_type(room_type)
+            if not nodes:
+                raise dungeonrooms.MissingNode
+            return nodes
+        return self.cached_distance_field(room_type, sources)
+
+    def breadth_first_path(self, start, goal):
+        """A shortest path from start to goal, in the same form as a_star.
+
+        With every connection the same length, a plain breadth first search
+        finds shortest paths too, with less work per node than a_star.
+        """
+        parent = {start: None}
+        frontier = deque([start])
+        while frontier:
+            current = frontier.popleft()
+            if current == goal:
+                return self.retrace(parent, goal)
+            for node in current.connected_nodes:
+                if node not in parent:
+                    parent[node] = current
+                    frontier.append(node)
+        raise ValueError("No path found")
 
     def portal_with_endpoints(self, start, end):
         connect = self.connection_with_endpoints(start, end)
@@ -286,15 +391,39 @@ class UndergroundRegion:
         else:
             raise Exception
 
+    def routes_to(self, goal):
+        """The first step from every node on a shortest path to goal.
+
+        Found with one breadth first search outward from goal, so only
+        nodes that can reach goal are included.
+        """
+        if self.routes is None:
+            self.routes = {}
+        try:
+            return self.routes[goal]
+        except KeyError:
+            pass
+        hops = {goal: None}
+        frontier = deque([goal])
+        while frontier:
+            current = frontier.popleft()
+            for node in current.connected_nodes:
+                if node not in hops:
+                    portal = self.portal_with_endpoints(node, current)
+                    hops[node] = (portal, current)
+                    frontier.append(node)
+        self.routes[goal] = hops
+        return hops
+
     def path_to_goal(self, start, goal):
-        path = self.a_star(start, goal)
+        hops = self.routes_to(goal)
+        if start not in hops:
+            raise ValueError("No path found")
         current = start
         portals = []
-        while path:
-            nxt = path.pop()
-            portal = self.portal_with_endpoints(current, nxt)
+        while current != goal:
+            portal, current = hops[current]
             portals.append(portal)
-            current = nxt
         return portals
 
     def path_to_location(self, start_location, goal_location):
@@ -330,7 +459,7 @@ class UndergroundRegion:
         return self.path_to_goal(start, goal)
 
     def has_location(self, location_):
-        return any((node.location == location_ for node in self.node_list))
+        return location_ in self.nodes_by_location
 
 RoomSeq = Sequence[Type[dungeonrooms.GeneratedRoom]]
 RoomIter = Iterable[Type[dungeonrooms.GeneratedRoom]]
@@ -343,11 +472,26 @@ class Caves(UndergroundRegion):
     optional_rooms = ()
     filler_rooms = ()
     breed_count = 0
+    # How many maps were grown to get this one
+    attempts = 0
     boss_policy = CreaturePolicy()
     enemy_policy = CreaturePolicy()
 
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, layout=None, **kwargs):
         self.unbuilt_nodes = []
+        if layout is None:
+            self.grow_graph(*args, **kwargs)
+            self.build_rooms()
+        else:
+            super().__init__(*args, **kwargs)
+            self.restore_layout(layout)
+            # Carry on from where the layout's random stream left off, so
+            # the rooms come out as if the graph had been grown right here.
+            with seeded_random(layout.random_state):
+                self.build_rooms()
+        # self.create_inhabitants()
+
+    def grow_graph(self, *args, **kwargs):
         n = 0
         while n < 100:
             n += 1
@@ -355,23 +499,35 @@ class Caves(UndergroundRegion):
             vec = Vector((0, 0))
             self.origin = Node(self, vec)
             self.breed_repeatedly(self.breed_count)
-            if (len(self.node_list) >= len(self.essential_rooms)
-                    and len(self.get_forks()) >= 2
-                    and len(self.get_vertices()) >= 4):
+            if self.meets_requirements():
                 dungeonrooms.debug('n={}'.format(n))
+                self.attempts = n
                 break
             else:
                 dungeonrooms.debug("rejected the following map:")
                 dungeonrooms.debug(self.get_text_map())
         else:
             raise Exception  # I generated 100 maps, and none worked.
+
+    def meets_requirements(self):
+        return (len(self.node_list) >= len(self.essential_rooms)
+                and len(self.get_forks()) >= 2
+                and len(self.get_vertices()) >= 4)
+
+    def restore_layout(self, layout):
+        nodes = [Node(self, Vector(coords)) for coords in layout.node_coords]
+        self.origin = nodes[0]
+        for start, end, letter in layout.connections:
+            Connection(self, nodes[start], nodes[end], letter_dict[letter])
+        self.unbred_nodes = [nodes[i] for i in layout.unbred_nodes]
+
+    def build_rooms(self):
         self.build_locations(
             essential=self.essential_rooms,
             optional=self.optional_rooms,
             filler=self.filler_rooms,
         )
         self.build_portals()
-        # self.create_inhabitants()
 
     def make_boss(self, *args, **kwargs):
         return self.boss_policy.get_creature(*args, **kwargs)
@@ -395,6 +551,7 @@ class Caves(UndergroundRegion):
     def build_room(self, room_type, node):
         assert self.unbuilt_nodes != []
         self.unbuilt_nodes.remove(node)
+        self.routes = None
         new_location = room_type(sched=self.schedule,
                                  reg=self,
                                  basis_location=node.location, )
@@ -455,6 +612,35 @@ class Caves(UndergroundRegion):
         return result_node.location
 
 
+class CaveLayout:
+    """The node graph of a freshly grown Caves region, as plain data.
+
+    Layouts hold no locations or schedule, so they can be grown in a worker
+    process and passed back to Caves(layout=...) in the main one. The random
+    state after growing is kept, so that rooms can be assigned afterwards
+    exactly as they would have been in a single process.
+    """
+
+    def __init__(self, region):
+        index = {node: i for i, node in enumerate(region.node_list)}
+        self.node_coords = [node.coords for node in region.node_list]
+        self.connections = [
+            (index[c.start], index[c.end], c.direction.letter)
+            for c in region.connection_list
+        ]
+        self.unbred_nodes = [index[node] for node in region.unbred_nodes]
+        self.random_state = getstate()
+
+
+def build_layout(region_type, layout_seed):
+    """Grow the node graph of a region_type from its own seed."""
+    with seeded_random(layout_seed):
+        region = region_type.__new__(region_type)
+        region.unbuilt_nodes = []
+        region.grow_graph()
+        return CaveLayout(region)
+
+
 class EmptyCaves(Caves):
     breed_count = 4
     essential_rooms = (dungeonrooms.CaveEntrance,)
@@ -499,9 +685,9 @@ class Connection:
     def __init__(self, region, start, end, direction):
         self.region = region
         self.portal = None
-        region.register_connection(self)
         self.start = start
         self.end = end
+        region.register_connection(self)
         start.connected_nodes.append(end)
         start.connections.append(self)
         end.connected_nodes.append(start)
@@ -529,6 +715,7 @@ class Connection:
             self.portal = portal_type(locations=self.locations(),
                                       directions=self.directions(),
                                       name=name, )
+            self.region.routes = None
 
 
 class Node:
@@ -547,11 +734,13 @@ class Node:
             Connection(self.region, parent, self, travel_d)
 
     def set_location(self, loc):
+        old_location = self.location
         self.location = loc
         loc.map_node = self
+        self.region.index_location(self, old_location)
 
     def distance(self, other_node):
-        return len(self.region.a_star(self, other_node))
+        return len(self.region.breadth_first_path(self, other_node))
 
     def manhattan(self, other_node):
         x = self.coords
@@ -559,17 +748,11 @@ class Node:
         return abs(x[0] - y[0]) + abs(x[1] - y[1])
 
     def distance_from_type(self, room_type):
-        try:
-            other_node = self.region.node_with_type(room_type)
-        except IndexError:
-            distance = 0  # zero distance, if there's no match
-        else:
-            distance = self.distance(other_node)
-        return distance
+        """Distance to the nearest room of room_type."""
+        return self.region.distances_from_type(room_type)[self]
 
     def distance_from_entrance(self):
-        entrance = self.region.get_entrance_node()
-        return self.distance(entrance)
+        return self.region.distances_from_entrance()[self]
 
     def is_entrance(self):
         if self.location:
@@ -679,7 +862,7 @@ if __name__ == "__main__":
     inventory_phrase = phrase.InventoryPhrase(my_parser, ["i", "inventory"])
     my_schedule.run_game()
     debug("Scheduled events:")
-    for e in my_schedule.event_list[::-1]:
+    for e in my_schedule.event_queue:
         debug("{}:{}@t={}".format(e.actor, e.action, e.time))
     debug("Hero damage:")
     debug(john.body.damage)
@@ -1,17 +1,22 @@
+import heapq
+import itertools
 import logging
+from math import inf
 from errors import ScheduleError
 debug = logging.debug
 logging.basicConfig(level=logging.WARNING, format='%(message)s')
 
 
 class Event:
+    action = None
+
     def __init__(self, schedule, time=0, content=None, instant=False):
         self.content = content
         self.time = time
         self.schedule = schedule
         self.is_instant = instant
-        schedule.add_event(self)
         self.actor = None
+        schedule.add_event(self)
 
     def __repr__(self):
         return self.content
@@ -38,12 +43,15 @@ class TimerEvent(Event):
 
 
     def happen(self):
+        # A handler returns a true value when the actor should act anew
         if self.keyword:
-            self.actor.hear_timer(self.keyword)
+            wake = self.actor.hear_timer(self.keyword)
         elif self.callback:
-            self.callback()
+            wake = self.callback()
         else:
             raise Exception("Hey! A timer had no callback or keyword.")
+        if wake:
+            self.schedule.wake(self.actor)
 
 
 class ActionEvent(Event):
@@ -95,59 +103,210 @@ class CooldownEvent(ActionEvent):
         self.schedule.grant_action(self.actor)
 
 
+class EventQueue:
+    """Binary heap of pending events.
+
+    Events pop in the same order the old sorted event list produced:
+    instant events first (most recently added first), then everything
+    else by time, with equal-time events in the order they were added.
+
+    Cancelled events are left in the heap as tombstones and skipped when
+    they reach the top, so cancelling costs O(1). Each actor's pending
+    events are also indexed, so cancelling everything an actor has queued
+    only touches that actor's own events.
+    """
+    min_compaction_size = 64
+
+    def __init__(self):
+        self.heap = []
+        self.events_added = 0
+        self.live_events = 0
+        self.actor_events = {}
+
+    def __len__(self):
+        return self.live_events
+
+    def __bool__(self):
+        return self.live_events > 0
+
+    def __iter__(self):
+        # Pending events in the order they will fire.
+        return (
+            entry[-1] for entry in sorted(self.heap)
+            if entry[-1] is not None
+        )
+
+    @staticmethod
+    def sort_key(event, order):
+        if event.is_instant:
+            return [0, 0, -order]
+        else:
+            return [1, event.time, order]
+
+    def push(self, event):
+        entry = self.sort_key(event, self.events_added)
+        entry.append(event)
+        self.events_added += 1
+        event.queue_entry = entry
+        heapq.heappush(self.heap, entry)
+        self.live_events += 1
+        if event.actor is not None:
+            self.actor_events.setdefault(event.actor, set()).add(event)
+
+    def pop(self):
+        while True:
+            event = heapq.heappop(self.heap)[-1]
+            if event is not None:
+                self.release(event)
+                return event
+
+    def release(self, event):
+        event.queue_entry = None
+        self.live_events -= 1
+        if event.actor is not None:
+            pending = self.actor_events[event.actor]
+            pending.discard(event)
+            if not pending:
+                del self.actor_events[event.actor]
+
+    def cancel(self, event):
+        entry = getattr(event, "queue_entry", None)
+        if entry is None:
+            # Already fired or cancelled
+            return False
+        entry[-1] = None
+        self.release(event)
+        if (
+            len(self.heap) > self.min_compaction_size
+            and len(self.heap) > 2 * self.live_events
+        ):
+            self.compact()
+        return True
+
+    def cancel_actor_events(self, actor, condition=None):
+        for event in list(self.actor_events.get(actor, ())):
+            if condition is None or condition(event):
+                self.cancel(event)
+
+    def compact(self):
+        self.heap = [entry for entry in self.heap if entry[-1] is not None]
+        heapq.heapify(self.heap)
+
+
+class ActorRegistry:
+    """Insertion-ordered set of actors.
+
+    Membership tests, insertion and removal are O(1), and iteration follows
+    the order actors were first added, so seeded runs grant actions in a
+    reproducible order.
+    """
+
+    def __init__(self):
+        self.members = {}
+
+    def __contains__(self, actor):
+        return actor in self.members
+
+    def __iter__(self):
+        return iter(self.members)
+
+    def __len__(self):
+        return len(self.members)
+
+    def __bool__(self):
+        return bool(self.members)
+
+    def add(self, actor):
+        self.members[actor] = None
+
+    def remove(self, actor):
+        del self.members[actor]
+
+    def discard(self, actor):
+        self.members.pop(actor, None)
+
+
+class ScheduleObserver:
+    """Base class for things that watch every event run_game fires.
+
+    Observers are added to Schedule.observers. With none attached,
+    run_game skips the hook entirely.
+    """
+
+    def before_event(self, event):
+        pass
+
+    def after_event(self, event):
+        pass
+
+
 class Schedule:
+    # Pending timers while run_history is running, otherwise None
+    history_timers = None
+
     def __init__(self):
         self.current_time = 0
-        self.event_list = list()
-        self.actors = list()
-        self.stopped_actors = list()
-        self.new_stopped_actors = list()
+        self.event_queue = EventQueue()
+        self.actors = ActorRegistry()
+        self.stopped_actors = ActorRegistry()
+        self.new_stopped_actors = ActorRegistry()
+        # Actors whose current action never finishes (eg. LongWait).
+        # They keep their scheduled_event, but hold no slot in the queue.
+        self.dormant_actors = ActorRegistry()
+        self.observers = []
         self.end_game = False
 
     def set_timer(self, actor, time, keyword=None, callback=None):
+        if self.history_timers is not None:
+            self.push_history_timer(
+                self.current_time + time, actor, keyword, callback
+            )
+            return None
         return TimerEvent(self, actor, time, keyword, callback)
 
     def add_event(self, new_event):
-        if new_event.is_instant:
-            self.event_list.append(new_event)
+        if new_event.action is not None and new_event.time == inf:
+            # This action would never fire, so park the actor instead
+            self.dormant_actors.add(new_event.actor)
+        elif self.history_timers is not None:
+            raise ScheduleError(
+                "Only timers can be scheduled while running history"
+            )
         else:
-            i = 0
-            try:
-                while self.event_list[i].time > new_event.time:
-                    i += 1
-                # if self.event_list[i].time == new_event.time:
-                # new_event.time += 1
-                self.event_list.insert(i, new_event)
-            except IndexError:
-                self.event_list.append(new_event)
+            self.event_queue.push(new_event)
+
+    def wake(self, actor):
+        """Interrupt a dormant actor's endless action and grant a new one."""
+        if actor in self.dormant_actors:
+            self.dormant_actors.remove(actor)
+            actor.scheduled_event = None
+            self.grant_action(actor)
 
     def add_actor(self, actor):
-        self.actors.append(actor)
-        if actor not in self.stopped_actors:
-            self.stopped_actors.append(actor)
+        self.actors.add(actor)
+        self.stopped_actors.add(actor)
 
     def remove_actor(self, actor):
         self.actors.remove(actor)
-        self.event_list = [e for e in self.event_list if e.actor != actor]
+        self.event_queue.cancel_actor_events(actor)
+        self.dormant_actors.discard(actor)
         actor.scheduled_event = None
 
     def cancel_event(self, event):
-        try:
-            self.event_list.remove(event)
-        except IndexError:
-            pass
+        self.event_queue.cancel(event)
 
     def cancel_actions(self, actor):
         e = actor.scheduled_event
         if e is not None and not isinstance(e, CooldownEvent):
-            # debug("queue before cancellation {}".format(self.event_list))
-            self.event_list = [e for e in self.event_list
-                               if e.actor != actor
-                               or e.action is None]
-            # debug("queue after cancellation {}".format(self.event_list))
+            # debug("queue before cancellation {}".format(list(self.event_queue)))
+            self.event_queue.cancel_actor_events(
+                actor, lambda e: e.action is not None
+            )
+            self.dormant_actors.discard(actor)
+            # debug("queue after cancellation {}".format(list(self.event_queue)))
             actor.scheduled_event = None
             self.grant_action(actor)
-            # debug("queue after grant {}".format(self.event_list))
+            # debug("queue after grant {}".format(list(self.event_queue)))
         else:
             pass
             # print_("HEY, CANCELLATION WITH NO SCHEDULED EVENT")
@@ -163,7 +322,7 @@ class Schedule:
             action = actor.get_action()
             ActionEvent(action)
         else:
-            self.new_stopped_actors.append(actor)
+            self.new_stopped_actors.add(actor)
 
     def run_game(self, duration=None):
         if duration is not None:
@@ -174,21 +333,91 @@ class Schedule:
 
         while (
             not self.end_game
-            and (self.event_list or self.stopped_actors)
+            and (self.event_queue or self.stopped_actors)
             and (end_time is None or self.current_time < end_time)
         ):
-            if self.stopped_actors:
-                for actor in self.stopped_actors:
+            while self.stopped_actors:
+                # Actors added while granting land in the fresh registry,
+                # and are granted on the next pass, still before any event.
+                stopped = self.stopped_actors
+                self.stopped_actors = ActorRegistry()
+                for actor in stopped:
                     if actor in self.actors:
                         self.grant_action(actor)
-                self.stopped_actors = list()
-            event = self.event_list.pop()
+            if not self.event_queue:
+                break
+            event = self.event_queue.pop()
             if event.actor in self.actors:
                 self.current_time = event.time
-                event.happen()
+                if self.observers:
+                    self.observe_event(event)
+                else:
+                    event.happen()
             else:
                 pass
 
+    def observe_event(self, event):
+        for observer in self.observers:
+            observer.before_event(event)
+        event.happen()
+        for observer in self.observers:
+            observer.after_event(event)
+
+
+    def push_history_timer(self, time, actor, keyword, callback):
+        # The running count keeps equal-time timers in the order they were
+        # set, and stops the heap from ever comparing actors.
+        heapq.heappush(
+            self.history_timers,
+            (time, next(self.history_order), actor, keyword, callback)
+        )
+
+    def run_history(self, duration):
+        """Fast-forward a world that is driven only by timers.
+
+        This advances the clock like run_game(duration), and world agents
+        take their turns in the same order, but no Event objects are
+        built and nobody is granted an action. That is all the 250 days
+        of world history before the hero appears need. Timers still
+        pending at the end go back into the event queue. Actors added
+        along the way stay stopped until the next run_game.
+        """
+        for event in self.event_queue:
+            if not isinstance(event, TimerEvent):
+                raise ScheduleError(
+                    "History can't be run with {} queued".format(event)
+                )
+        end_time = self.current_time + duration
+        self.end_game = False
+        self.history_timers = timers = []
+        self.history_order = itertools.count()
+        while self.event_queue:
+            event = self.event_queue.pop()
+            self.push_history_timer(
+                event.time, event.actor, event.keyword, event.callback
+            )
+        try:
+            while (
+                not self.end_game
+                and timers
+                and self.current_time < end_time
+            ):
+                time, order, actor, keyword, callback = heapq.heappop(timers)
+                if actor in self.actors:
+                    self.current_time = time
+                    if keyword:
+                        actor.hear_timer(keyword)
+                    else:
+                        callback()
+        finally:
+            self.history_timers = None
+            del self.history_order
+            while timers:
+                time, order, actor, keyword, callback = heapq.heappop(timers)
+                TimerEvent(
+                    self, actor, time - self.current_time, keyword, callback
+                )
+
 
 class DefaultSchedule(Schedule):
     default_schedule = None
@@ -206,4 +435,4 @@ if __name__ == "__main__":
     e2 = Event(my_schedule, 0, "Before A", True)
     e3 = Event(my_schedule, 2000, "C")
     e4 = Event(my_schedule, 2000, "D")
-    # prin([event.content for event in my_schedule.event_list])
+    # prin([event.content for event in my_schedule.event_queue])
@@ -13,6 +13,8 @@ from typing import Optional
 
 
 class ShopkeeperAI(ai.PeacefulAI):
+    interests = ai.PeacefulAI.interests | {"handling", "transaction"}
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.customers_seen_today = set()
@@ -1,5 +1,6 @@
 import region
 import game_object
+from random import getrandbits, getstate
 import actor
 import ai
 import body
@@ -109,14 +110,19 @@ class Site:
     def unused_morphs(self):
         return self.morphs[self.unused_morph_index:]
 
-    def update_region(self):
+    def prepare_region(self):
+        """Build the region and apply its morphs, but show no one in it."""
         if not self.region:
             self.construct_base_region()
-        
+        self.apply_morphs()
+
+    def apply_morphs(self):
         for morph in self.unused_morphs():
             self.region = morph.alter_region(self.region)
         self.unused_morph_index = len(self.morphs)
 
+    def update_region(self):
+        self.prepare_region()
         for population in self.populations:
             population.render(self.region)
 
@@ -196,13 +202,38 @@ class TownBuildingMorph(Morph):
 
 class RegionSite(Site):
     region_type = None
+    region_seed = None
+    # Where the site's own random stream for morphs left off
+    morph_random_state = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Drawn now, so the region is the same whenever it is built
+        self.region_seed = getrandbits(64)
 
     def construct_base_region(self):
+        layout = None
+        if self.region_seed is not None:
+            layout = region.build_layout(self.region_type, self.region_seed)
         self.region = self.region_type(
             entrance_portal=self.entrance_portal,
-            sched=self.schedule
+            sched=self.schedule,
+            layout=layout,
         )
 
+    def apply_morphs(self):
+        if self.region_seed is None:
+            # Sites from saves older than per-site seeds use the global one
+            super().apply_morphs()
+            return
+        # Morphs draw from the site's own stream, so they come out the
+        # same whenever they are applied
+        with region.seeded_random(
+            self.morph_random_state or "{} morphs".format(self.region_seed)
+        ):
+            super().apply_morphs()
+            self.morph_random_state = getstate()
+
 
 # TODO: Make some kind of a class-factory for the following RegionSites?
 
@@ -0,0 +1,205 @@
+from unittest import TestCase
+
+import action
+import actor
+import ai
+import trait
+from action import Action
+from agentactions import AmbushActor
+import game_object
+from game_object import Container, Item, Thing
+from schedule import Schedule
+from wide import Overworld
+
+
+class TestTraitIndex(TestCase):
+    def test_index_follows_things(self):
+        room, other_room = Thing(), Thing()
+        sword = Item(location=room, name="sword")
+        assert room.things_with_trait(trait.item) == {sword}
+        sword.change_location(other_room)
+        assert room.things_with_trait(trait.item) == set()
+        assert other_room.things_with_trait(trait.item) == {sword}
+        sword.vanish()
+        assert other_room.things_with_trait(trait.item) == set()
+        assert other_room.trait_index == {}
+        sword.materialize(room)
+        assert room.things_with_trait(trait.item) == {sword}
+
+    def test_new_traits_are_indexed(self):
+        room = Thing()
+        ham = Item(location=room, name="ham")
+        ham.traits.add(trait.food())
+        assert room.things_with_trait(trait.food) == {ham}
+        assert room.things_with_trait(trait.meat) == set()
+
+    def test_result_is_a_copy(self):
+        room = Thing()
+        sword = Item(location=room, name="sword")
+        room.things_with_trait(trait.item).clear()
+        assert room.things_with_trait(trait.item) == {sword}
+
+
+class Listener(Thing):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.traits.add(trait.listener())
+        self.heard = []
+
+    def wants_announcement(self, action):
+        return True
+
+    def hear_announcement(self, action):
+        self.heard.append(action)
+
+
+class TestAnnouncements(TestCase):
+    def test_listeners_follow_things(self):
+        room = Thing()
+        first = Listener(location=room)
+        assert room.listeners() == (first,)
+        second = Listener(location=room)
+        assert set(room.listeners()) == {first, second}
+        first.vanish()
+        assert room.listeners() == (second,)
+
+    def test_listeners_kept_while_stepping(self):
+        overworld = Overworld(sched=Schedule(), width=100, height=100)
+        walker = Listener(location=overworld, coordinates=(10, 10))
+        Listener(location=overworld, coordinates=(20, 20))
+        listeners = overworld.listeners()
+        walker.change_location(overworld, (11, 10))
+        assert overworld.listeners() is listeners
+        walker.vanish()
+        assert overworld.listeners() != listeners
+
+    def test_everyone_hears_once(self):
+        room = Thing()
+        speaker, target = Listener(location=room), Listener(location=room)
+        bystander, outsider = Listener(location=room), Listener()
+        action = Action(speaker, target, outsider)
+        room.broadcast_announcement(action)
+        assert speaker.heard == target.heard == [action]
+        assert bystander.heard == outsider.heard == [action]
+
+    def test_targets_hear_unseen_actors(self):
+        room = Thing()
+        speaker, target = Listener(location=room), Listener(location=room)
+        bystander = Listener(location=room)
+        speaker.physical = False
+        action = Action(speaker, target)
+        room.broadcast_announcement(action)
+        assert target.heard == [action]
+        assert speaker.heard == bystander.heard == []
+
+    def test_overworld_reaches_only_nearby_listeners(self):
+        overworld = Overworld(sched=Schedule(), width=100, height=100)
+        speaker = Listener(location=overworld, coordinates=(50, 50))
+        near = Listener(location=overworld, coordinates=(55, 50))
+        crowd = [
+            Listener(location=overworld, coordinates=(90, y))
+            for y in range(0, 100, 5)
+        ]
+        action = Action(speaker, crowd[0])
+        overworld.broadcast_announcement(action)
+        assert speaker.heard == near.heard == crowd[0].heard == [action]
+        assert all(not listener.heard for listener in crowd[1:])
+
+    def test_uninterested_listeners_are_skipped(self):
+        room = Thing()
+        speaker = Listener(location=room)
+        guard = actor.Person(location=room, name="guard", sched=Schedule())
+        ai.PeacefulAI(guard)
+        heard = []
+        guard.ai.hear_announcement = heard.append
+        wait = action.Wait(speaker)
+        room.broadcast_announcement(wait)
+        assert heard == []
+        speak = action.Speak(speaker, text="Hello")
+        room.broadcast_announcement(speak)
+        assert heard == []
+        ambush = AmbushActor(speaker, speaker)
+        room.broadcast_announcement(ambush)
+        assert heard == [ambush]
+
+
+class TestActionCategories(TestCase):
+    def test_categories_follow_flags(self):
+        assert action.Wait.categories == frozenset()
+        assert action.Speak.categories == {"speech"}
+        assert action.Enter.categories == {"movement"}
+        assert action.VectorTravel.categories == {"movement"}
+        assert action.Unlock.categories == {"locking"}
+        assert action.Buy.categories == {"social", "transaction"}
+        assert action.Take.categories == {"handling"}
+        assert AmbushActor.categories == {"hostile"}
+
+    def test_routines_pass_on_their_interests(self):
+        person = actor.Person(name="prisoner")
+        ai.PeacefulAI(person)
+        unlock = action.Unlock(person)
+        assert not person.wants_announcement(unlock)
+        ai.PrisonerAI(person)
+        assert person.wants_announcement(unlock)
+        ai.PeacefulAI(person)
+
+        class UnlockWatcher(action.Routine, action.ZeroTargetAction):
+            interests = frozenset({"locking"})
+
+        person.ai.routine = UnlockWatcher(person)
+        assert person.wants_announcement(unlock)
+
+
+class TestInteractablesCache(TestCase):
+    def test_repeat_lookups_are_shared(self):
+        room = Thing()
+        chest = Container(location=room, name="chest")
+        coin = Item(location=chest, name="coin")
+        assert room.get_interactables() == {chest, coin}
+        assert room.get_interactables() is room.get_interactables()
+
+    def test_moves_invalidate(self):
+        room = Thing()
+        chest = Container(location=room, name="chest")
+        coin = Item(location=chest, name="coin")
+        room.get_interactables()
+        coin.vanish()
+        assert room.get_interactables() == {chest}
+        coin.materialize(chest)
+        assert room.get_interactables() == {chest, coin}
+        coin.change_location(Thing())
+        assert room.get_interactables() == {chest}
+
+    def test_visibility_changes_invalidate(self):
+        room = Thing()
+        viewer = Thing(location=room)
+        chest = Container(location=room, name="chest")
+        assert chest in room.get_interactables(viewer)
+        generation = room.generation
+        chest.physical = False
+        assert chest not in room.get_interactables(viewer)
+        chest.is_open = False
+        assert room.generation == generation + 2
+
+    def test_caches_are_per_location(self):
+        room, hall = Thing(), Thing()
+        chest = Container(location=room, name="chest")
+        interactables = room.get_interactables()
+        Item(location=hall, name="broom")
+        assert room.get_interactables() is interactables
+        # Changes inside a container reach the location enclosing it
+        generation = room.generation
+        Item(location=chest, name="coin")
+        assert room.generation == generation + 1
+        assert room.get_interactables() is not interactables
+
+    def test_valid_targets(self):
+        room = Thing()
+        person = actor.Person(location=room, name="porter", sched=Schedule())
+        sack = Container(location=person, name="sack")
+        sword = Item(location=room, name="sword")
+        assert person.get_valid_targets() == {person, sack, sword}
+        assert person.get_valid_targets() is person.get_valid_targets()
+        sword.change_location(person)
+        assert person.get_valid_targets() == {person, sack, sword}
+        assert person.get_targets_from_name("sword") == [sword]
@@ -0,0 +1,61 @@
+import queue
+import tempfile
+from unittest import TestCase
+
+import action
+import actor
+import ai
+from input_providers import FileInput, QueueInput, ScriptedInput
+from world import ActorTest
+
+
+class TestInputProviders(TestCase):
+    def test_scripted_input_ends_with_eof(self):
+        source = ScriptedInput(["look", "wait"])
+        assert source.read(">") == "look"
+        assert source.read(">") == "wait"
+        with self.assertRaises(EOFError):
+            source.read(">")
+
+    def test_file_input(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".txt") as file:
+            file.write("i\n\nquit\n")
+            file.flush()
+            source = FileInput(file.name)
+        assert [source.read(">") for _ in range(3)] == ["i", "", "quit"]
+
+    def test_queue_input(self):
+        commands = queue.Queue()
+        commands.put("i")
+        commands.put(None)
+        source = QueueInput(commands)
+        assert source.read(">") == "i"
+        with self.assertRaises(EOFError):
+            source.read(">")
+        with self.assertRaises(EOFError):
+            QueueInput(queue.Queue(), timeout=0).read(">")
+
+    def test_parser_plays_script(self):
+        world = ActorTest()
+        parser = world.actor.ai
+        parser.input_source = ScriptedInput(["I", "wait for ten seconds"] * 50)
+        with self.assertRaises(EOFError):
+            world.run_game()
+        assert world.schedule.current_time >= 50 * 10000
+
+    def test_interrupt_check_while_routine_idle(self):
+        world = ActorTest()
+        parser = world.actor.ai
+        monster = actor.Person(
+            location=world.test_location,
+            name="monster",
+            sched=world.schedule,
+        )
+        ai.WanderingMonsterAI(monster)
+        # A routine is running, but nothing is scheduled for it yet
+        parser.routine = action.TakeAllRoutine(world.actor)
+        assert parser.get_current_action() is None
+        parser.input_source = ScriptedInput(["n"])
+        parser.hear_announcement(action.LoudWait(monster))
+        with self.assertRaises(EOFError):
+            parser.input_source.read(">")
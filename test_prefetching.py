@@ -0,0 +1,80 @@
+import random
+from types import SimpleNamespace
+from unittest import TestCase
+
+import direction
+import prefetching
+import sites
+from schedule import Schedule
+from wide import Overworld
+from world import make_player
+
+
+class TestRegionPrefetcher(TestCase):
+    def build(self):
+        random.seed(3)
+        self.overworld = Overworld(sched=Schedule(), width=50, height=50)
+        self.caves = [
+            sites.RuneCave.at_point(
+                location=self.overworld,
+                coordinates=coordinates,
+                direction=direction.down,
+                landmark_name="cave",
+            )
+            for coordinates in [(10, 10), (12, 10), (40, 40)]
+        ]
+        for cave in self.caves:
+            cave.add_morph(sites.KoboldHabitation())
+        self.hero = make_player(
+            self.overworld, (0, 0),
+            landmarks=[cave.landmark for cave in self.caves],
+        )
+        self.prefetcher = prefetching.RegionPrefetcher(self.hero, radius=5)
+        self.prefetcher.attach(self.overworld.schedule)
+        self.addCleanup(self.prefetcher.detach)
+
+    def step_to(self, coordinates):
+        self.hero.change_location(self.overworld, coordinates)
+        self.prefetcher.after_event(SimpleNamespace(actor=self.hero))
+
+    def rooms(self, cave):
+        return (
+            cave.region.get_text_map(),
+            [type(node.location) for node in cave.region.node_list],
+        )
+
+    def test_sites_in_reach_are_prefetched(self):
+        self.build()
+        self.step_to((0, 0))
+        assert [cave.region for cave in self.caves] == [None, None, None]
+        self.step_to((11, 8))
+        near, also_near, far = self.caves
+        assert near.region is not None and also_near.region is not None
+        assert near.unused_morphs() == []
+        assert far.region is None
+
+    def test_prefetched_region_matches_one_built_on_entry(self):
+        self.build()
+        cave = self.caves[0]
+        cave.update_region()
+        built_on_entry = self.rooms(cave)
+        self.build()
+        cave = self.caves[0]
+        self.step_to((11, 8))
+        game_state = random.getstate()
+        cave.update_region()
+        # Entry only shows the populations; the rest was done already
+        assert random.getstate() == game_state
+        assert self.rooms(cave) == built_on_entry
+
+    def test_morphs_added_later_are_applied(self):
+        def rooms(prefetch):
+            self.build()
+            cave = self.caves[0]
+            if prefetch:
+                self.step_to((11, 8))
+            cave.add_morph(sites.GhoulHabitation())
+            cave.update_region()
+            return self.rooms(cave)
+
+        assert rooms(prefetch=True) == rooms(prefetch=False)
@@ -0,0 +1,32 @@
+from unittest import TestCase
+
+from profiling import Profiler
+from schedule import Schedule
+
+
+class Listener:
+    scheduled_event = None
+
+    def hear_timer(self, keyword):
+        pass
+
+
+class TestProfiler(TestCase):
+    def test_counts_events_and_actors(self):
+        schedule = Schedule()
+        profiler = Profiler(sample_every=2)
+        profiler.attach(schedule)
+        actor = Listener()
+        schedule.actors.add(actor)
+        for second in range(1, 11):
+            schedule.set_timer(actor, second * 1000, "tick")
+        schedule.run_game()
+        assert profiler.event_counts["TimerEvent"] == 10
+        assert list(profiler.actor_times) == [actor]
+        # Sampled once each event has been popped
+        assert profiler.queue_lengths == [9, 7, 5, 3, 1]
+        # Ten events, the last nine seconds after the first
+        assert abs(profiler.events_per_simulated_second() - 10 / 9) < 1e-9
+        assert "TimerEvent" in profiler.report()
+        profiler.detach()
+        assert schedule.observers == []
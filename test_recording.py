@@ -0,0 +1,48 @@
+import io
+import random
+from unittest import TestCase
+
+import recording
+from input_providers import ScriptedInput
+from world import ActorTest
+
+
+class TestRecording(TestCase):
+    commands = ["i", "wait for ten seconds", "quit"]
+
+    def record(self):
+        random.seed(1)
+        world = ActorTest()
+        stream = io.StringIO()
+        recorder = recording.TraceRecorder(stream, seed=1)
+        recorder.attach(world)
+        world.actor.ai.input_source = ScriptedInput(self.commands)
+        world.run_game()
+        stream.seek(0)
+        return recording.Trace.read(stream)
+
+    def test_trace_records_inputs_and_events(self):
+        trace = self.record()
+        assert trace.seed == 1
+        assert trace.inputs() == self.commands
+        assert any(entry[0] == "event" for entry in trace.entries)
+
+    def test_replay_matches(self):
+        trace = self.record()
+        random.seed(trace.seed)
+        replayed = trace.replay(ActorTest())
+        assert trace.first_mismatch(replayed) is None
+
+    def test_mismatch_is_reported(self):
+        trace = self.record()
+        shorter = recording.Trace(trace.seed, trace.entries[:-1])
+        assert trace.first_mismatch(shorter) == len(trace.entries) - 1
+
+    def test_options_kept_in_header(self):
+        stream = io.StringIO()
+        recording.TraceRecorder(stream, seed=1, options={"prefetch_radius": 5})
+        stream.seek(0)
+        trace = recording.Trace.read(stream)
+        assert trace.options == {"prefetch_radius": 5}
+        old = recording.Trace.read(io.StringIO('{"seed": 1}\n'))
+        assert old.seed == 1 and old.options == {}
@@ -0,0 +1,174 @@
+from random import getrandbits, seed
+from unittest import TestCase
+
+import direction
+import dungeonrooms
+import region
+import sites
+from schedule import Schedule
+from wide import Overworld
+
+
+class TestCaveLayout(TestCase):
+    def test_layout_rebuilds_same_region(self):
+        schedule = Schedule()
+        for layout_seed in range(10):
+            layout = region.build_layout(region.RuneCave, layout_seed)
+            with region.seeded_random(layout_seed):
+                grown = region.RuneCave(sched=schedule)
+            rebuilt = region.RuneCave(sched=schedule, layout=layout)
+            assert grown.get_text_map() == rebuilt.get_text_map()
+            assert (
+                [type(node.location) for node in grown.node_list]
+                == [type(node.location) for node in rebuilt.node_list]
+            )
+
+    def test_site_region_ignores_game_random(self):
+        def text_map(draws):
+            seed(12)
+            overworld = Overworld(sched=Schedule(), width=10, height=10)
+            site = sites.RuneCave.at_point(
+                location=overworld,
+                coordinates=(5, 5),
+                direction=direction.down,
+                landmark_name="cave",
+            )
+            for _ in range(draws):
+                getrandbits(64)
+            site.construct_base_region()
+            return site.region.get_text_map()
+
+        assert text_map(0) == text_map(5)
+
+
+class TestCaveGrowth(TestCase):
+    def test_maps_meet_requirements(self):
+        for region_seed in range(10):
+            with region.seeded_random(region_seed):
+                cave = region.EmptyTomb(sched=Schedule())
+            assert cave.meets_requirements()
+            assert cave.attempts >= 1
+
+
+class TestPathfinding(TestCase):
+    def check_path(self, start, goal, path, length):
+        assert len(path) == length
+        assert (path[0] if path else start) == goal
+        steps = [start] + path[::-1]
+        for here, there in zip(steps, steps[1:]):
+            assert there in here.connected_nodes
+
+    def test_paths_are_shortest(self):
+        with region.seeded_random(5):
+            cave = region.EmptyTomb(sched=Schedule())
+        nodes = cave.node_list
+        for start in nodes:
+            # Lengths from a search written out the simplest way
+            lengths = {start: 0}
+            frontier = [start]
+            while frontier:
+                next_frontier = []
+                for here in frontier:
+                    for node in here.connected_nodes:
+                        if node not in lengths:
+                            lengths[node] = lengths[here] + 1
+                            next_frontier.append(node)
+                frontier = next_frontier
+            for goal in nodes:
+                for path in (
+                    cave.a_star(start, goal),
+                    cave.breadth_first_path(start, goal),
+                ):
+                    self.check_path(start, goal, path, lengths[goal])
+                assert start.distance(goal) == lengths[goal]
+
+    def test_unreachable_goal(self):
+        with region.seeded_random(5):
+            cave = region.EmptyTomb(sched=Schedule())
+        island = region.Node(cave, region.Vector((100, 100)))
+        with self.assertRaises(ValueError):
+            cave.a_star(cave.origin, island)
+        with self.assertRaises(ValueError):
+            cave.breadth_first_path(cave.origin, island)
+
+    def test_routes_walk_shortest_paths(self):
+        with region.seeded_random(5):
+            cave = region.EmptyTomb(sched=Schedule())
+        for goal in cave.node_list:
+            for start in cave.node_list:
+                portals = cave.path_to_goal(start, goal)
+                assert len(portals) == start.distance(goal)
+                here = start.location
+                for portal in portals:
+                    assert portal.location == here
+                    here = portal.opposite().location
+                assert here == goal.location
+
+    def test_routes_forgotten_when_region_changes(self):
+        with region.seeded_random(5):
+            cave = region.EmptyTomb(sched=Schedule())
+        start, goal = cave.node_list[0], cave.node_list[-1]
+        cave.path_to_goal(start, goal)
+        assert goal in cave.routes
+        region.Node(cave, region.Vector((100, 100)))
+        assert cave.routes is None
+        with self.assertRaises(ValueError):
+            cave.path_to_goal(cave.node_list[-1], goal)
+
+
+class TestRegionIndexes(TestCase):
+    def test_indexes_match_scans(self):
+        with region.seeded_random(8):
+            cave = region.GiantInsectHive(sched=Schedule())
+        for node in cave.node_list:
+            assert cave.node_with_vector(node.vector) is node
+            assert cave.has_location(node.location)
+            for other in node.connected_nodes:
+                connection = cave.connection_with_endpoints(node, other)
+                assert {connection.start, connection.end} == {node, other}
+        assert cave.node_with_vector(region.Vector((1000, 0))) is None
+        for room_type in (
+            dungeonrooms.GeneratedRoom, dungeonrooms.CaveEntrance,
+            dungeonrooms.QueenApartment, dungeonrooms.Prison,
+        ):
+            assert cave._nodes_with_type(room_type) == [
+                node for node in cave.node_list
+                if isinstance(node.location, room_type)
+            ]
+
+    def test_rebuilt_rooms_are_reindexed(self):
+        with region.seeded_random(8):
+            cave = region.EmptyTomb(sched=Schedule())
+        node = cave.node_list[-1]
+        old_location = node.location
+        cave.unbuilt_nodes.append(node)
+        cave.build_room(dungeonrooms.Prison, node)
+        assert not cave.has_location(old_location)
+        assert cave.has_location(node.location)
+        assert cave.node_with_type(dungeonrooms.Prison) is node
+        assert node not in cave._nodes_with_type(type(old_location))
+
+
+class TestDistanceFields(TestCase):
+    def test_fields_match_paths(self):
+        with region.seeded_random(9):
+            cave = region.GiantInsectHive(sched=Schedule())
+        entrance = cave.get_entrance_node()
+        fillers = cave._nodes_with_type(dungeonrooms.HiveFiller)
+        for node in cave.node_list:
+            assert node.distance_from_entrance() == node.distance(entrance)
+            assert node.distance_from_type(dungeonrooms.HiveFiller) == min(
+                node.distance(filler) for filler in fillers
+            )
+        with self.assertRaises(dungeonrooms.MissingNode):
+            cave.distances_from_type(dungeonrooms.TombSanctum)
+
+    def test_fields_forgotten_when_rooms_change(self):
+        with region.seeded_random(9):
+            cave = region.EmptyTomb(sched=Schedule())
+        node = cave.node_list[-1]
+        with self.assertRaises(dungeonrooms.MissingNode):
+            node.distance_from_type(dungeonrooms.Prison)
+        cave.unbuilt_nodes.append(node)
+        cave.build_room(dungeonrooms.Prison, node)
+        assert node.distance_from_type(dungeonrooms.Prison) == 0
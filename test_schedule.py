@@ -0,0 +1,226 @@
+from random import Random
+from unittest import TestCase
+
+from errors import ScheduleError
+from schedule import Event, Schedule, TimerEvent
+
+
+class Listener:
+    scheduled_event = None
+
+    def __init__(self):
+        self.heard = []
+
+    def hear_timer(self, keyword):
+        self.heard.append(keyword)
+
+
+class Sleeper(Listener):
+    """Asks for one long action each time it is granted a turn."""
+
+    def __init__(self, schedule, granted, spawn=None):
+        super().__init__()
+        self.schedule = schedule
+        self.granted = granted
+        self.spawn = spawn
+
+    def get_action(self):
+        self.granted.append(self)
+        if self.spawn is not None:
+            self.schedule.add_actor(self.spawn)
+        return SleepAction(self)
+
+    def attempt_action(self, action):
+        pass
+
+
+class SleepAction:
+    is_instant = False
+    time_elapsed = 1000
+    cooldown_time = 1000
+
+    def __init__(self, actor):
+        self.actor = actor
+
+
+class Hibernator(Sleeper):
+    """Sleeps forever, as WaitingAI agents do with LongWait."""
+
+    def get_action(self):
+        action = super().get_action()
+        action.time_elapsed = float("inf")
+        return action
+
+    def hear_timer(self, keyword):
+        super().hear_timer(keyword)
+        return keyword == "spring"
+
+
+def sorted_list_order(specs):
+    """The firing order of the original sorted-list schedule."""
+    event_list = []
+    for name, time, instant in specs:
+        if instant:
+            event_list.append((name, time))
+            continue
+        i = 0
+        while i < len(event_list) and event_list[i][1] > time:
+            i += 1
+        event_list.insert(i, (name, time))
+    return [name for name, time in event_list[::-1]]
+
+
+class TestEventQueue(TestCase):
+    def test_instant_events_fire_first(self):
+        schedule = Schedule()
+        Event(schedule, 0, "A")
+        Event(schedule, 1000, "B")
+        Event(schedule, 0, "Before A", True)
+        Event(schedule, 0, "Before that", True)
+        order = [schedule.event_queue.pop().content for _ in range(4)]
+        assert order == ["Before that", "Before A", "A", "B"]
+
+    def test_equal_times_keep_insertion_order(self):
+        schedule = Schedule()
+        for name in "CDEF":
+            Event(schedule, 2000, name)
+        Event(schedule, 1000, "B")
+        order = [e.content for e in schedule.event_queue]
+        assert order == ["B", "C", "D", "E", "F"]
+
+    def test_matches_sorted_list_order(self):
+        rng = Random(1)
+        specs = []
+        for i in range(500):
+            specs.append((str(i), rng.randint(1, 50), False))
+        # Instant events are stamped with the current time, which is never
+        # later than anything already queued.
+        specs.append(("instant", 0, True))
+        specs.append(("later instant", 0, True))
+        schedule = Schedule()
+        for name, time, instant in specs:
+            Event(schedule, time, name, instant)
+        popped = []
+        while schedule.event_queue:
+            popped.append(schedule.event_queue.pop().content)
+        assert popped == sorted_list_order(specs)
+
+    def test_cancel_event(self):
+        schedule = Schedule()
+        first = Event(schedule, 10, "first")
+        Event(schedule, 20, "second")
+        schedule.cancel_event(first)
+        schedule.cancel_event(first)
+        assert [e.content for e in schedule.event_queue] == ["second"]
+
+    def test_remove_actor_only_drops_its_events(self):
+        schedule = Schedule()
+        leaving, staying = Listener(), Listener()
+        for actor in (leaving, staying):
+            schedule.add_actor(actor)
+            for time in (10, 20, 30):
+                TimerEvent(schedule, actor, time, keyword=time)
+        schedule.remove_actor(leaving)
+        assert len(schedule.event_queue) == 3
+        assert all(e.actor is staying for e in schedule.event_queue)
+        while schedule.event_queue:
+            schedule.event_queue.pop().happen()
+        assert staying.heard == [10, 20, 30]
+        assert leaving.heard == []
+
+    def test_cancelled_events_are_compacted(self):
+        schedule = Schedule()
+        actor = Listener()
+        schedule.add_actor(actor)
+        timers = [
+            TimerEvent(schedule, actor, time, keyword=time)
+            for time in range(1000)
+        ]
+        for timer in timers[:-1]:
+            schedule.cancel_event(timer)
+        assert len(schedule.event_queue) == 1
+        assert len(schedule.event_queue.heap) < 100
+        assert schedule.event_queue.pop() is timers[-1]
+
+    def test_stopped_actors_granted_in_order(self):
+        schedule = Schedule()
+        granted = []
+        late = Sleeper(schedule, granted)
+        sleepers = [Sleeper(schedule, granted) for _ in range(5)]
+        sleepers[1].spawn = late
+        for sleeper in sleepers + [sleepers[0]]:
+            schedule.add_actor(sleeper)
+        schedule.run_game(1)
+        assert granted == sleepers + [late]
+
+    def test_endless_actions_park_actor(self):
+        schedule = Schedule()
+        granted = []
+        bear = Hibernator(schedule, granted)
+        schedule.add_actor(bear)
+        schedule.run_game(1)
+        assert bear in schedule.dormant_actors
+        assert not schedule.event_queue
+        assert bear.scheduled_event.action.actor is bear
+
+    def test_timer_wakes_dormant_actor(self):
+        schedule = Schedule()
+        granted = []
+        bear = Hibernator(schedule, granted)
+        schedule.add_actor(bear)
+        schedule.set_timer(bear, 500, keyword="spring")
+        schedule.run_game(1000)
+        assert bear.heard == ["spring"]
+        assert granted == [bear, bear]
+        assert bear in schedule.dormant_actors
+
+    def test_timer_leaves_dormant_actor_unless_asked(self):
+        schedule = Schedule()
+        granted = []
+        bear = Hibernator(schedule, granted)
+        schedule.add_actor(bear)
+        schedule.set_timer(bear, 500, keyword="daily")
+        schedule.run_game(1000)
+        assert bear.heard == ["daily"]
+        assert granted == [bear]
+        assert bear in schedule.dormant_actors
+
+    def test_cancel_and_remove_dormant_actor(self):
+        schedule = Schedule()
+        granted = []
+        bear = Hibernator(schedule, granted)
+        schedule.add_actor(bear)
+        schedule.run_game(1)
+        schedule.cancel_actions(bear)
+        assert granted == [bear, bear]
+        schedule.remove_actor(bear)
+        assert bear not in schedule.dormant_actors
+        assert bear.scheduled_event is None
+
+    def test_history_matches_run_game(self):
+        def timeline(run):
+            schedule = Schedule()
+            heard = []
+
+            class Agent(Listener):
+                def hear_timer(self, keyword):
+                    heard.append((schedule.current_time, self.name))
+                    schedule.set_timer(self, self.period, keyword)
+
+            for name, period in (("a", 300), ("b", 200), ("c", 300)):
+                agent = Agent()
+                agent.name, agent.period = name, period
+                schedule.actors.add(agent)
+                schedule.set_timer(agent, period, "update")
+            getattr(schedule, run)(1000)
+            pending = [(e.time, e.actor.name) for e in schedule.event_queue]
+            return heard, schedule.current_time, pending
+
+        assert timeline("run_history") == timeline("run_game")
+
+    def test_history_refuses_queued_actions(self):
+        schedule = Schedule()
+        schedule.add_actor(Sleeper(schedule, []))
+        schedule.run_game(1)
+        with self.assertRaises(ScheduleError):
+            schedule.run_history(1000)
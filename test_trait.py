@@ -0,0 +1,82 @@
+import base64
+import pickle
+from dataclasses import dataclass
+from unittest import TestCase
+
+import trait
+from game_object import Item
+
+
+@dataclass
+class weight:
+    pounds: int = 0
+
+
+# Pickled by the code before traits were a bitmask: a TraitSet holding item
+# and food, and an open chest holding a sword.
+OLD_TRAITS = (
+    b"\x80\x04\x95N\x00\x00\x00\x00\x00\x00\x00\x8c\x05trait\x94\x8c\x08TraitSet"
+    b"\x94\x93\x94)\x81\x94}\x94\x8c\ncomponents\x94}\x94(h\x00\x8c\x04item\x94"
+    b"\x93\x94h\x08)\x81\x94h\x00\x8c\x04food\x94\x93\x94h\x0b)\x81\x94usb."
+)
+OLD_CHEST = base64.b64decode(
+    "gASVOgIAAAAAAACMC2dhbWVfb2JqZWN0lIwJQ29udGFpbmVylJOUKYGUfZQojAtkYW1h"
+    "Z2VfdHlwZZSMBWJsdW50lIwLZGFtYWdlX211bHSUSwGMCHBoeXNpY2FslIiMDXRyYXBw"
+    "aW5nX2l0ZW2UTowLY29vcmRpbmF0ZXOUTowGdGhpbmdzlI+UKGgAjARJdGVtlJOUKYGU"
+    "fZQoaAVoBmgHSwFoCIhoCU5oCk5oC4+UjAZ0cmFpdHOUjAV0cmFpdJSMCFRyYWl0U2V0"
+    "lJOUKYGUfZSMCmNvbXBvbmVudHOUfZRoE4wEaXRlbZSTlGgbKYGUc3NijAhsb2NhdGlv"
+    "bpRoA4wRb3JpZ2luYWxfbG9jYXRpb26UaAOMCGFycmFuZ2VklIiMCHNjaGVkdWxllE6M"
+    "C25hbWVfb2JqZWN0lGghjAROYW1llJOUKYGUfZQojAZwcm9wZXKUiYwOZGlzcGxheV9z"
+    "dHJpbmeUjAVzd29yZJSMCWxlbW1hX3NldJSPlChoKJB1YowEbmFtZZRoKIwObmVhcmVz"
+    "dF9wb3J0YWyUTowFb3duZXKUTowFcHJpY2WUTowQZGFtYWdlX3JlZHVjdGlvbpRLAHVi"
+    "kGgSaBUpgZR9lGgYfZQoaBtoGymBlGgTjAljb250YWluZXKUk5RoNSmBlHVzYmgdTmge"
+    "TmgfiGggTmghaCMpgZR9lChoJoloJ4wFY2hlc3SUaCmPlChoOZB1YmgraDloLE5oLU5o"
+    "Lk5oL0sAjAdpc19vcGVulIh1Yi4="
+)
+
+
+class TestTraitSet(TestCase):
+    def test_marker_traits(self):
+        traits = trait.TraitSet()
+        traits.add(trait.item())
+        traits.add(trait.food())
+        assert traits.contains_trait(trait.item)
+        assert not traits.contains_trait(trait.meat)
+        assert traits[trait.food] == trait.food()
+        assert traits[trait.meat] is None
+        assert traits.has_all(trait.item, trait.food)
+        assert not traits.has_all(trait.item, trait.meat)
+        assert traits.has_any(trait.meat, trait.food)
+        assert not traits.has_any(trait.meat, trait.hero)
+        assert set(traits.trait_types()) == {trait.item, trait.food}
+
+    def test_traits_with_data(self):
+        traits = trait.TraitSet()
+        heavy = weight(50)
+        traits.add(heavy)
+        heavy.pounds = 10
+        assert traits[weight] == weight(50)
+        assert traits.has_all(weight)
+        assert list(traits.trait_types()) == [weight]
+
+    def test_pickle_keeps_traits(self):
+        sword = Item(name="sword")
+        sword.traits.add(weight(3))
+        state = sword.traits.__getstate__()
+        assert trait.item in state["mask"]
+        copied = pickle.loads(pickle.dumps(sword))
+        assert copied.has_all_traits(trait.item, weight)
+        assert copied.traits[weight] == weight(3)
+        assert copied.traits.owner is copied
+
+    def test_old_pickles_load(self):
+        traits = pickle.loads(OLD_TRAITS)
+        assert traits.has_all(trait.item, trait.food)
+        assert traits.data == {}
+        assert traits.owner is None
+        chest = pickle.loads(OLD_CHEST)
+        [sword] = chest.things
+        assert chest.is_open and chest.physical
+        assert sword.traits.owner is sword
+        assert chest.things_with_trait(trait.item) == {sword}
+        assert chest.get_interactables() == {sword}
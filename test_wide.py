@@ -0,0 +1,227 @@
+from random import Random
+from unittest import TestCase, mock
+
+import actor
+import ai
+import trait
+from field import Disk, Field
+from game_object import Thing
+from location import Location
+from schedule import Schedule
+import wide
+from wide import Overworld, PositionStore
+
+
+class TestOverworldGrid(TestCase):
+    def setUp(self):
+        rng = Random(3)
+        self.overworld = Overworld(sched=Schedule(), width=200, height=200)
+        self.things = []
+        for i in range(300):
+            point = (rng.uniform(0, 200), rng.uniform(0, 200))
+            thing = Thing(location=self.overworld, coordinates=point)
+            thing.traits.add(trait.town() if i % 2 else trait.portal())
+            self.things.append(thing)
+
+    def scan(self, trait_type, center, radius):
+        return {
+            x for x in Location.things_with_trait(self.overworld, trait_type)
+            if self.overworld.distance(x, center) < radius
+        }
+
+    def test_radius_queries_match_scan(self):
+        rng = Random(4)
+        for _ in range(200):
+            center = (rng.uniform(-10, 210), rng.uniform(-10, 210))
+            radius = rng.choice([1, 10, 25, 300])
+            assert (
+                self.overworld.things_with_trait(trait.town, center, radius)
+                == self.scan(trait.town, center, radius)
+            )
+
+    def test_grid_follows_moves(self):
+        town = self.things[1]
+        town.change_location(self.overworld, (100.5, 100.5))
+        assert town in self.overworld.things_with_trait(
+            trait.town, (100, 100), 1
+        )
+        town.vanish()
+        assert town not in self.overworld.things_with_trait(
+            trait.town, (100, 100), 1
+        )
+        assert town not in self.overworld.grid.cell_of
+
+    def test_things_in_view(self):
+        viewer = self.things[0]
+        seen = self.overworld.things_in_view(viewer)
+        assert seen == {
+            t for t in self.overworld.things
+            if self.overworld.line_of_sight(viewer, t)
+        }
+
+    def test_nearest_with_trait(self):
+        center = (100, 100)
+        towns = self.overworld.things_with_trait(trait.town)
+        expected = sorted(towns, key=lambda t: self.overworld.distance(t, center))
+        assert self.overworld.nearest_with_trait(trait.town, center, 5) == (
+            expected[:5]
+        )
+        assert self.overworld.nearest_with_trait(
+            trait.town, center, 500, radius=20
+        ) == [t for t in expected if self.overworld.distance(t, center) < 20]
+
+    def test_distances(self):
+        center = (12.5, 40)
+        distances = self.overworld.distances(center, self.things)
+        for thing, distance in zip(self.things, distances):
+            assert abs(distance - self.overworld.distance(thing, center)) < 1e-9
+
+
+class TestOverworldGridWithoutNumpy(TestOverworldGrid):
+    """The same queries, answered from PositionStore's plain lists."""
+
+    def setUp(self):
+        patcher = mock.patch.object(wide, "numpy", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        super().setUp()
+
+
+class Watcher(ai.AI):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.seen = []
+        self.lost = []
+
+    def see_thing(self, thing):
+        self.seen.append(thing)
+
+    def lose_sight_of(self, thing):
+        self.lost.append(thing)
+
+
+class TestViewDeltas(TestCase):
+    def test_steps_report_only_changes(self):
+        rng = Random(6)
+        overworld = Overworld(sched=Schedule(), width=100, height=100)
+        for _ in range(400):
+            point = (rng.uniform(0, 100), rng.uniform(0, 100))
+            Thing(location=overworld, coordinates=point)
+        walker = actor.Person(
+            location=overworld, coordinates=(0, 50), name="walker"
+        )
+        watcher = Watcher(walker)
+        walker.change_location(overworld, (1, 50))
+        in_view = overworld.things_in_view(walker) - {walker}
+        assert set(watcher.seen) == in_view
+        for x in range(2, 100):
+            watcher.seen, watcher.lost = [], []
+            walker.change_coordinates((x, 50))
+            new_view = overworld.things_in_view(walker) - {walker}
+            assert set(watcher.seen) == new_view - in_view
+            assert set(watcher.lost) == in_view - new_view
+            in_view = new_view
+
+    def test_returning_thing_is_seen_again(self):
+        overworld = Overworld(sched=Schedule(), width=100, height=100)
+        elsewhere = Overworld(sched=overworld.schedule, width=100, height=100)
+        walker = actor.Person(
+            location=overworld, coordinates=(50, 50), name="walker"
+        )
+        other = Thing(location=overworld, coordinates=(52, 50))
+        watcher = Watcher(walker)
+        walker.change_coordinates((51, 50))
+        assert other in watcher.seen
+        # other leaves and comes back between two of walker's steps
+        other.change_location(elsewhere, (52, 50))
+        other.change_location(overworld, (52, 50))
+        watcher.seen = []
+        walker.change_coordinates((50, 50))
+        assert watcher.seen == [other]
+        # Without moving, it isn't sighted again
+        watcher.seen = []
+        walker.change_coordinates((51, 50))
+        assert watcher.seen == []
+
+    def test_new_location_is_seen_whole(self):
+        overworld = Overworld(sched=Schedule(), width=100, height=100)
+        other = Overworld(sched=overworld.schedule, width=100, height=100)
+        here = Thing(location=overworld, coordinates=(50, 50))
+        there = Thing(location=other, coordinates=(50, 50))
+        walker = actor.Person(
+            location=overworld, coordinates=(50, 50), name="walker"
+        )
+        watcher = Watcher(walker)
+        walker.change_location(overworld, (51, 50))
+        # The walker never sights itself
+        assert watcher.seen == [here]
+        watcher.seen = []
+        walker.change_location(other, (51, 50))
+        # Arriving somewhere new, everything in view is seen afresh
+        assert watcher.seen == [there]
+        assert watcher.lost == [here]
+
+
+class TestPositionStore(TestCase):
+    def check_store(self):
+        store = PositionStore()
+        things = [Thing() for _ in range(200)]
+        for i, thing in enumerate(things):
+            store.add(thing, (i, 0))
+        for thing in things[::2]:
+            store.remove(thing)
+        # The freed rows are reused, and moving a thing keeps its row
+        newcomer = Thing()
+        store.add(newcomer, (-2.5, 0))
+        store.add(things[1], (1.5, 0))
+        assert store.used == 200
+        kept = things[1::2] + [newcomer]
+        assert list(store.distances((0, 0), kept[:2])) == [1.5, 3]
+        assert store.nearest((0, 0), kept, 3) == [things[1], newcomer, things[3]]
+        assert store.within((0, 0), kept, 4) == [things[1], things[3], newcomer]
+        assert store.nearest((0, 0), [], 3) == []
+
+    def test_store(self):
+        self.check_store()
+
+    def test_store_without_numpy(self):
+        with mock.patch.object(wide, "numpy", None):
+            self.check_store()
+
+
+class TestEncounterBins(TestCase):
+    def test_bins_hold_every_field_that_can_fire(self):
+        rng = Random(5)
+        overworld = Overworld(sched=Schedule(), width=100, height=100)
+        disks = [
+            Disk(
+                overworld,
+                radius=rng.uniform(1, 15),
+                center=(rng.uniform(0, 100), rng.uniform(0, 100)),
+                height=0.5,
+            )
+            for _ in range(40)
+        ]
+        anywhere = Field(overworld)
+        walker = Thing(location=overworld, coordinates=(0, 0))
+        overworld.generate_encounters(walker)
+        bins = overworld.encounter_bins
+        for _ in range(500):
+            x, y = rng.uniform(0, 100), rng.uniform(0, 100)
+            fields = bins.fields_at(x, y)
+            assert anywhere in fields
+            for disk in disks:
+                if disk.probability(walker, x, y):
+                    assert disk in fields
+
+    def test_bins_rebuilt_when_fields_change(self):
+        overworld = Overworld(sched=Schedule(), width=100, height=100)
+        walker = Thing(location=overworld, coordinates=(50, 50))
+        overworld.generate_encounters(walker)
+        disk = Disk(overworld, radius=5, center=(50, 50), height=0.5)
+        assert overworld.encounter_bins is None
+        overworld.generate_encounters(walker)
+        assert overworld.encounter_bins.fields_at(50, 50) == [disk]
+        disk.destroy()
+        overworld.generate_encounters(walker)
+        assert overworld.encounter_bins.fields_at(50, 50) == []
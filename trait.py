@@ -1,23 +1,110 @@
 from typing import Type, TypeVar, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from copy import copy
 
+# Every trait type a TraitSet holds is a bit of an int, and only traits that
+# carry data also keep an instance. Bits are handed out the first time each
+# trait type is seen, so they only mean something within one process;
+# TraitSets pickle as lists of trait types.
+_bits = {}
+_types_by_bit = []
+
+
+def trait_bit(trait_type):
+    try:
+        return _bits[trait_type]
+    except KeyError:
+        bit = 1 << len(_types_by_bit)
+        _bits[trait_type] = bit
+        _types_by_bit.append(trait_type)
+        return bit
+
+
+def traits_mask(trait_types):
+    mask = 0
+    for trait_type in trait_types:
+        mask |= trait_bit(trait_type)
+    return mask
+
+
+def is_marker(trait_type):
+    return not fields(trait_type)
+
+
 class TraitSet:
-    def __init__(self):
-        self.components = {}
+    def __init__(self, owner=None):
+        self.mask = 0
+        # Only traits that carry data are kept as instances
+        self.data = {}
+        # The Thing these traits belong to, whose container indexes them
+        self.owner = owner
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["mask"] = [
+            trait_type for trait_type in _types_by_bit
+            if self.mask & _bits[trait_type]
+        ]
+        return state
+
+    def __setstate__(self, state):
+        if "components" in state:
+            # Saved before traits were a bitmask: a dict of type -> instance
+            components = state.pop("components")
+            state["mask"] = list(components)
+            state["data"] = {
+                trait_type: instance
+                for trait_type, instance in components.items()
+                if not is_marker(trait_type)
+            }
+        state["mask"] = traits_mask(state["mask"])
+        self.__dict__.update(state)
+        # Old saves have no owner; Thing.__setstate__ fills it in
+        self.__dict__.setdefault("owner", None)
     
     T = TypeVar('T')
     def __getitem__(self, key: Type[T]) -> Optional[T]:
-        return self.components.get(key, None)
+        if not self.mask & trait_bit(key):
+            return None
+        elif key in self.data:
+            return self.data[key]
+        else:
+            return key()
     
     def __setitem__(self, key: Type[T], val: T):
-        self.components[key] = copy(val)
+        self.mask |= trait_bit(key)
+        if not is_marker(key):
+            self.data[key] = copy(val)
+        self._index(key)
     
     def contains_trait(self, key: Type[T]):
-        return key in self.components
+        # A type that was never given a bit can't be in any TraitSet
+        return self.mask & _bits.get(key, 0) != 0
+
+    def has_all(self, *keys):
+        mask = traits_mask(keys)
+        return self.mask & mask == mask
+
+    def has_any(self, *keys):
+        return bool(self.mask & traits_mask(keys))
+
+    def trait_types(self):
+        types = []
+        mask = self.mask
+        while mask:
+            bit = mask & -mask
+            types.append(_types_by_bit[bit.bit_length() - 1])
+            mask ^= bit
+        return types
     
     def add(self, new_trait):
-        self.components[type(new_trait)] = copy(new_trait)
+        self[type(new_trait)] = new_trait
+
+    def _index(self, key):
+        container = getattr(self.owner, "location", None)
+        if container is not None:
+            container.index_trait(self.owner, key)
+
 
 @dataclass
 class item: pass
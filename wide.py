@@ -1,20 +1,217 @@
 import direction
 import game_object
+import heapq
 import random
 import math
 import encounter
 from string import ascii_lowercase
 from collections import Counter
+try:
+    import numpy
+except ImportError:
+    # PositionStore falls back on plain lists without numpy
+    numpy = None
 
 # logging.basicConfig(level=logging.DEBUG, format='%(message)s')
 import location
 import trait
 
+class SpatialGrid:
+    """Buckets things by the square cell their coordinates fall in.
+
+    Queries return every thing in the cells overlapping a square around a
+    point, so callers still check the exact distance themselves.
+    """
+
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.cell_of = {}
+
+    def cell(self, x, y):
+        return math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+
+    def add(self, thing, coordinates):
+        if coordinates is None:
+            return
+        key = self.cell(*coordinates)
+        self.cells.setdefault(key, set()).add(thing)
+        self.cell_of[thing] = key
+
+    def remove(self, thing):
+        key = self.cell_of.pop(thing, None)
+        if key is not None:
+            bucket = self.cells[key]
+            bucket.discard(thing)
+            if not bucket:
+                del self.cells[key]
+
+    def cell_range(self, center, radius):
+        x, y = center
+        i_min, j_min = self.cell(x - radius, y - radius)
+        i_max, j_max = self.cell(x + radius, y + radius)
+        return range(i_min, i_max + 1), range(j_min, j_max + 1)
+
+    def cells_covered(self, center, radius):
+        i_range, j_range = self.cell_range(center, radius)
+        return len(i_range) * len(j_range)
+
+    def near(self, center, radius):
+        i_range, j_range = self.cell_range(center, radius)
+        if len(i_range) * len(j_range) > len(self.cells):
+            # Cheaper to walk the occupied cells than the whole square
+            buckets = (
+                bucket for (i, j), bucket in self.cells.items()
+                if i in i_range and j in j_range
+            )
+        else:
+            buckets = (
+                self.cells[key] for key in
+                ((i, j) for i in i_range for j in j_range)
+                if key in self.cells
+            )
+        for bucket in buckets:
+            yield from bucket
+
+
+def point_distances(center, points):
+    """Distance from center to each of points, in order."""
+    x, y = center
+    if numpy is None:
+        return [math.hypot(px - x, py - y) for px, py in points]
+    points = numpy.asarray(points, dtype=float).reshape(-1, 2)
+    return numpy.hypot(points[:, 0] - x, points[:, 1] - y)
+
+
+class PositionStore:
+    """Coordinates of things, one row each in a single array.
+
+    Rows freed by things that leave are reused by the next to arrive.
+    Distance queries look up the rows they need and measure them all in one
+    numpy call; without numpy, rows are tuples in a list and get measured
+    one at a time.
+    """
+    initial_capacity = 64
+
+    def __init__(self):
+        self.slot_of = {}
+        self.free_slots = []
+        self.used = 0
+        if numpy is None:
+            self.rows = []
+        else:
+            self.rows = numpy.zeros((self.initial_capacity, 2))
+
+    def new_slot(self):
+        if self.free_slots:
+            return self.free_slots.pop()
+        slot = self.used
+        self.used += 1
+        if numpy is None:
+            self.rows.append(None)
+        elif slot == len(self.rows):
+            self.rows = numpy.concatenate(
+                (self.rows, numpy.zeros_like(self.rows))
+            )
+        return slot
+
+    def add(self, thing, coordinates):
+        if coordinates is None:
+            self.remove(thing)
+            return
+        slot = self.slot_of.get(thing)
+        if slot is None:
+            slot = self.slot_of[thing] = self.new_slot()
+        self.rows[slot] = tuple(coordinates)
+
+    def remove(self, thing):
+        slot = self.slot_of.pop(thing, None)
+        if slot is not None:
+            self.free_slots.append(slot)
+
+    def points(self, things):
+        slots = [self.slot_of[thing] for thing in things]
+        if numpy is None:
+            return [self.rows[slot] for slot in slots]
+        return self.rows[numpy.array(slots, dtype=int)]
+
+    def distances(self, center, things):
+        """Distance from center to each of things, in order."""
+        return point_distances(center, self.points(things))
+
+    def within(self, center, things, radius):
+        things = list(things)
+        distances = self.distances(center, things)
+        if numpy is None:
+            return [t for t, d in zip(things, distances) if d < radius]
+        return [things[i] for i in numpy.flatnonzero(distances < radius)]
+
+    def nearest(self, center, things, k):
+        """The k of things nearest center, nearest first."""
+        things = list(things)
+        if k <= 0 or not things:
+            return []
+        distances = self.distances(center, things)
+        if numpy is None:
+            order = heapq.nsmallest(
+                k, range(len(things)), key=distances.__getitem__
+            )
+        else:
+            order = numpy.arange(len(things))
+            if k < len(things):
+                order = numpy.argpartition(distances, k - 1)[:k]
+            order = order[numpy.argsort(distances[order], kind="stable")]
+        return [things[i] for i in order]
+
+
+class EncounterBins:
+    """Which encounter fields can reach each cell of the map.
+
+    Each field is binned by its bounding box; fields without one are
+    included in every cell. Bins list fields in the order they were given.
+    """
+
+    def __init__(self, fields, cell_size):
+        self.cell_size = cell_size
+        boxed = []
+        for field in fields:
+            box = field.bounding_box()
+            boxed.append(None if box is None else list(self.cells_in(box)))
+        self.bins = {
+            cell: [] for cells in boxed if cells is not None for cell in cells
+        }
+        self.everywhere = []
+        for field, cells in zip(fields, boxed):
+            if cells is None:
+                self.everywhere.append(field)
+                cells = self.bins
+            for cell in cells:
+                self.bins[cell].append(field)
+
+    def cell(self, x, y):
+        return math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+
+    def cells_in(self, box):
+        x_min, y_min, x_max, y_max = box
+        i_min, j_min = self.cell(x_min, y_min)
+        i_max, j_max = self.cell(x_max, y_max)
+        for i in range(i_min, i_max + 1):
+            for j in range(j_min, j_max + 1):
+                yield i, j
+
+    def fields_at(self, x, y):
+        return self.bins.get(self.cell(x, y), self.everywhere)
+
+
 class Overworld(location.Location):
     view_distance = 10
+    # Rebuilt from encounter_fields whenever it is None
+    encounter_bins = None
 
     def __init__(self, *args, width=30, height=30, **kwargs):
         location.Location.__init__(self, *args, **kwargs)
+        self.grid = SpatialGrid(cell_size=self.view_distance)
+        self.positions = PositionStore()
         self.encounter_fields = []
         self.width = width
         self.height = height
@@ -26,17 +223,66 @@ class Overworld(location.Location):
         out += f"\nCoordinates: ({x:.1f},{y:.1f})"
         return out
 
+    def add_thing(self, thing, coordinates=None):
+        super().add_thing(thing, coordinates)
+        self.grid.add(thing, thing.coordinates)
+        self.positions.add(thing, thing.coordinates)
+
+    def remove_thing(self, thing):
+        super().remove_thing(thing)
+        self.grid.remove(thing)
+        self.positions.remove(thing)
+
+    def point(self, thing_or_point):
+        try:
+            return thing_or_point.get_coordinates(self)
+        except AttributeError:
+            return thing_or_point
+
     def things_with_trait(self, trait, center=None, radius=None):
         assert type(trait) == type
-        candidates = super().things_with_trait(trait)
-        if center is not None and radius is not None:
-            out = set(
-                x for x in candidates
-                if self.distance(x, center) < radius
+        if center is None or radius is None:
+            return super().things_with_trait(trait)
+        candidates = self.trait_index.get(trait, ())
+        center_point = self.point(center)
+        if self.grid.cells_covered(center_point, radius) < len(candidates):
+            candidates = (
+                x for x in self.grid.near(center_point, radius)
+                if x.has_trait(trait)
             )
+        return set(self.positions.within(center_point, candidates, radius))
+
+    def nearest_with_trait(self, trait, center, k=1, radius=None):
+        """The k things with trait nearest center, nearest first."""
+        if radius is None:
+            candidates = self.trait_index.get(trait, ())
         else:
-            out = candidates
-        return out
+            candidates = self.things_with_trait(trait, center, radius)
+        return self.positions.nearest(self.point(center), candidates, k)
+
+    def distances(self, center, things):
+        """Distance from center to each of things here, in order."""
+        return self.positions.distances(self.point(center), things)
+
+    def point_distances(self, center, points):
+        return point_distances(self.point(center), points)
+
+    def announcement_listeners(self, source):
+        listener_count = len(self.trait_index.get(trait.listener, ()))
+        center = self.point(source)
+        if self.grid.cells_covered(center, self.view_distance) < listener_count:
+            # Only listeners in sight range can perceive it
+            return [
+                t for t in self.grid.near(center, self.view_distance)
+                if t.has_trait(trait.listener)
+            ]
+        return self.listeners()
+
+    def things_in_view(self, viewer, trait_type=None):
+        nearby = self.grid.near(self.point(viewer), self.view_distance)
+        if trait_type is not None:
+            nearby = (t for t in nearby if t.has_trait(trait_type))
+        return {t for t in nearby if self.line_of_sight(viewer, t)}
 
     def sites(self, center=None, radius=None):
         # If you specify a center/radius, you must specify both
@@ -125,15 +371,24 @@ class Overworld(location.Location):
 
     def add_encounter_field(self, field):
         self.encounter_fields.append(field)
+        self.encounter_bins = None
 
     def remove_encounter_field(self, field):
         self.encounter_fields.remove(field)
+        self.encounter_bins = None
 
     def generate_encounters(self, actor):
         assert self.has_thing(actor)
         x, y = actor.coordinates
-        random.shuffle(self.encounter_fields)
-        for field in self.encounter_fields:
+        if self.encounter_bins is None:
+            self.encounter_bins = EncounterBins(
+                self.encounter_fields, cell_size=self.view_distance
+            )
+        # Fields that can't reach this point would never fire, so only the
+        # ones that can are shuffled and rolled for.
+        fields = list(self.encounter_bins.fields_at(x, y))
+        random.shuffle(fields)
+        for field in fields:
             if (
                 field.targets_actor(actor)
                 and random.random() < field.probability(actor, x, y)
@@ -143,7 +398,7 @@ class Overworld(location.Location):
 
     def broadcast_announcement(self, action):
         out = super().broadcast_announcement(action)
-        if getattr(action, "travels_overland", False):
+        if action.travels_overland:
             self.generate_encounters(action.actor)
         return out
 
@@ -8,6 +8,7 @@ import name_object
 import namemaker
 import phrase
 import posture
+import prefetching
 import schedule
 import sites
 import spells
@@ -110,7 +111,12 @@ class PopulationTest(SiteTest):
 
 
 class Random(World):
-    def __init__(self, use_web_output=False, save_manager=None):
+    history_length = 250 * day
+
+    def __init__(
+        self, use_web_output=False, save_manager=None, fast_history=True,
+        prefetch_radius=None,
+    ):
         super().__init__(save_manager=save_manager)
         self.schedule = schedule.Schedule()
         world_map = wide.Overworld(
@@ -145,7 +151,10 @@ class Random(World):
         for i in range(20):
             testing_shopkeeper_agent = agent.ShopkeeperAgent.in_world(world_map)
 
-        self.schedule.run_game(250 * day)
+        if fast_history:
+            self.schedule.run_history(self.history_length)
+        else:
+            self.schedule.run_game(self.history_length)
 
         self.actor = make_player(
             location=world_map,
@@ -155,6 +164,13 @@ class Random(World):
             use_web_output=use_web_output,
         )
 
+        if prefetch_radius:
+            # Regions are built as the hero nears each site, not all now
+            prefetcher = prefetching.RegionPrefetcher(
+                self.actor, prefetch_radius
+            )
+            prefetcher.attach(self.schedule)
+
         if self.save_manager:
             phrase.SpecialPhrase(
                 callback=self.save,
@@ -207,6 +223,7 @@ class Static(World):
         town_landmark = town_portal.source.create_landmark(name=town_name)
         landmarks = {caves_landmark, town_landmark}
         john = make_player(plains, (15, 15), landmarks, use_web_output)
+        self.actor = john
         if self.save_manager:
             phrase.SpecialPhrase(
                 callback=self.save,